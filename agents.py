@@ -0,0 +1,405 @@
+# agents.py
+#
+# Les deux "IA" du jeu, séparées des boucles pygame pour pouvoir être
+# utilisées aussi bien avec le rendu qu'en simulation headless.
+
+import time
+
+import astar
+import astar_spatiotemporal as astar_st
+import dstar_lite
+import instrument
+import lanes
+
+
+def heuristic_table(timeline, goals):
+    """
+    Distances vers les nénuphars sur la carte agrégée du niveau
+    (lanes.WorldTimeline.passable_masks), calculées une fois par disposition.
+    """
+    return astar.distance_table(timeline.passable_masks(), timeline.grid_width, astar.goal_set(goals))
+
+
+def source_world(world):
+    """
+    Le World d'une photographie (planner_thread.WorldSnapshot), ou world
+    lui-même : les états gardés d'un plan à l'autre sont liés à ce monde.
+    """
+    return getattr(world, 'source', world)
+
+
+class ReactiveAgent:
+    """
+    Version classique (x,y) : à chaque frame, on reconstruit la grille et on
+    relance A* pour faire un seul pas vers l'arrivée.
+    Avec incremental=True, un planificateur D* Lite garde son état d'une
+    frame à l'autre et ne répare que les cases de la grille qui ont changé.
+    """
+    def __init__(self, incremental=False):
+        self.incremental = incremental
+        self.replan_times = []  # durée de chaque replanification, en secondes
+        self.search_stats = {}  # nœuds développés / ajoutés par A*, cumulés
+
+        # État du planificateur incrémental, par grenouille :
+        # frog -> (monde, grille précédente, D* Lite)
+        self.dstar = {}
+        self.last_changes = None  # (ancienne grille, grille, cases changées)
+
+    def act(self, world, frog):
+        self.act_all(world, [frog])
+
+    def act_all(self, world, frogs):
+        """
+        Un pas pour chacune des grenouilles : la grille et la table
+        d'heuristique ne sont calculées qu'une fois pour toutes, seule la
+        recherche est faite grenouille par grenouille.
+        """
+        frogs = [frog for frog in frogs if not frog.dead]
+        if not frogs:
+            return
+
+        # On définit les départs
+        starts = [(frog.rect.x // astar.TILE_SIZE, frog.rect.y // astar.TILE_SIZE) for frog in frogs]
+        for frog, path in zip(frogs, self.paths(world, starts, keys=frogs)):
+            if path and len(path) > 1:
+                # la toute première case vers laquelle la grenouille doit se déplacer
+                frog.move_to(path[1])
+            # Si aucun chemin n'est trouvé, la grenouille ne bouge pas
+
+    def paths(self, world, starts, keys=None):
+        """
+        Chemins (col, row) depuis chaque départ de starts vers le nénuphar
+        atteignable le plus proche, sur la grille du tick courant. world peut
+        être un World ou une photographie (planner_thread.WorldSnapshot) ;
+        keys identifie l'état D* Lite de chaque départ (une grenouille).
+        """
+        started = time.perf_counter()
+
+        # On créé la grille à jour (obstacle maintenant ou à la prochaine frame),
+        # à partir des cycles de voies déjà calculés
+        with instrument.timer('agent.grid'):
+            timeline = lanes.as_timeline(world.world_sprites(), world.level)
+            grid = timeline.conservative_grid()
+
+        # Tous les nénuphars sont des arrivées possibles
+        goals = world.level.goal_positions()
+        table = None if self.incremental else heuristic_table(timeline, goals)
+        if keys is None:
+            keys = [None] * len(starts)
+
+        paths = []
+        for start_pos_grid, key in zip(starts, keys):
+            # On applique A* pour trouver le chemin vers le nénuphar atteignable le plus proche
+            with instrument.timer('agent.search'):
+                if self.incremental:
+                    paths.append(self.incremental_path(world, grid, start_pos_grid, goals, key))
+                else:
+                    paths.append(astar.astar(grid, start_pos_grid, goals, heuristic=table,
+                                             stats=self.search_stats))
+
+        self.replan_times.append(time.perf_counter() - started)
+        return paths
+
+    def incremental_path(self, world, grid, start_pos_grid, end_pos_grid, frog=None):
+        """ Répare le chemin de la frame précédente de frog avec D* Lite. """
+        world = source_world(world)
+        if frog in self.dstar:
+            dstar_world, old_grid, planner = self.dstar[frog]
+            if dstar_world is world and planner.goals == astar.goal_set(end_pos_grid):
+                planner.update(grid, self.changed_cells(old_grid, grid), start_pos_grid)
+                self.dstar[frog] = (world, grid, planner)
+                return planner.path()
+
+        # Premier appel, autre monde ou autres nénuphars visés : on repart de zéro
+        planner = dstar_lite.DStarLite(grid, start_pos_grid, end_pos_grid)
+        self.dstar[frog] = (world, grid, planner)
+        return planner.path()
+
+    def changed_cells(self, old_grid, grid):
+        """
+        dstar_lite.changed_cells, mémorisé pour la dernière paire de grilles :
+        toutes les grenouilles d'un même tick partagent le même calcul.
+        """
+        if self.last_changes is None or self.last_changes[0] is not old_grid or self.last_changes[1] is not grid:
+            self.last_changes = (old_grid, grid, dstar_lite.changed_cells(old_grid, grid))
+        return self.last_changes[2]
+
+
+class SpatioTemporalAgent:
+    """
+    Version spatio-temporelle : on calcule un plan complet (col, row, time)
+    que la grenouille exécute pas à pas, et on replanifie quand il est épuisé.
+    Avec validate=True, la suite du plan est revérifiée à chaque tick contre
+    le monde réel ; si une étape n'est plus sûre, on ne recalcule que la fin
+    du plan à partir de l'étape précédente.
+    Avec cooperative=True, les grenouilles de act_all planifient dans
+    l'ordre de la liste et chaque plan est réservé
+    (astar_spatiotemporal.ReservationTable) : les grenouilles suivantes ne
+    passent ni par la même case au même tick, ni en sens inverse sur la
+    même arête.
+    Avec budget_ms, la recherche d'une grenouille ne dure pas plus de
+    budget_ms millisecondes par tick (à quelques expansions près) ; ce n'est
+    pas une borne sur tout le tick, qui construit aussi les cycles de voies,
+    le tableau d'occupation et la table d'heuristique d'un nouveau monde et
+    valide le plan. La recherche est une astar_spatiotemporal.AnytimeSearch,
+    dont le meilleur plan (éventuellement partiel) est suivi tout de suite,
+    puis amélioré aux ticks suivants tant qu'il garde les étapes déjà
+    exécutées.
+    Avec sipp=True, la recherche porte sur les intervalles sûrs des cases
+    (spatio_temporal_astar(sipp=True)), ce qui permet des horizons max_time
+    bien plus longs ; la planification coopérative et le mode anytime
+    gardent la recherche tick par tick.
+    Avec swept=True, les plans évitent aussi les cases qu'une voiture
+    traverse entre deux ticks (collision en temps continu, voir
+    lanes.WorldTimeline.frog_blocked_masks).
+    """
+    # Au-delà, on reconstruit le tableau d'occupation plutôt que de l'allonger
+    MAX_OCCUPANCY_AGE = 1000
+
+    def __init__(self, max_time=100, max_nodes=None, verbose=False, validate=True, cooperative=False,
+                 budget_ms=None, swept=False, sipp=False):
+        self.max_time = max_time      # horizon de planification (en ticks)
+        self.max_nodes = max_nodes    # budget d'expansions (None = illimité)
+        self.budget_ms = budget_ms    # durée max. de la recherche, par tick et par grenouille (None = illimité)
+        self.verbose = verbose
+        self.validate = validate
+        self.cooperative = cooperative
+        self.swept = swept
+        self.sipp = sipp
+
+        # Planification coopérative : (monde, table de réservation) et, par
+        # grenouille, le plan réservé avec le tick de son état d'indice 0
+        self.reservations = None
+        self.reserved = {}
+
+        # Mode anytime : frog -> AnytimeSearch qui améliore encore son plan
+        self.searches = {}
+
+        # Tableau d'occupation réutilisé d'un plan à l'autre : (monde, tick d'origine, tableau)
+        self.occupancy = None
+        self.replan_times = []  # durée de chaque planification, en secondes
+        self.search_stats = {}  # nœuds développés / ajoutés par la recherche, cumulés
+        self.repairs = 0        # nombre de plans réparés au lieu d'être recalculés
+
+    def occupancy_for(self, world):
+        """ Retourne (tableau d'occupation, start_time) valable pour le tick courant. """
+        if self.occupancy is not None:
+            occupancy_world, origin_tick, occupancy = self.occupancy
+            if occupancy_world is source_world(world) and world.tick - origin_tick <= self.MAX_OCCUPANCY_AGE:
+                return occupancy, world.tick - origin_tick
+
+        occupancy = astar_st.OccupancyTensor(world.world_sprites(), 0, exact=True, level=world.level,
+                                             swept=self.swept)
+        self.occupancy = (source_world(world), world.tick, occupancy)
+        return occupancy, 0
+
+    def first_invalid_step(self, world, frog, blocked=None):
+        """
+        Indice de la première étape restante de frog.path qui tuerait la
+        grenouille dans le monde actuel, ou None si tout le plan est sûr.
+        L'étape path_step + k est exécutée pendant le k-ième tick à venir.
+        blocked (voir blocked_masks) permet de partager les masques entre
+        les grenouilles d'un même tick.
+        """
+        if blocked is None:
+            blocked = self.blocked_masks(world)
+        for k, (col, row, _) in enumerate(frog.path[frog.path_step:]):
+            masks = blocked(k)
+            if not (0 <= row < len(masks) and 0 <= col < world.level.grid_width):
+                return frog.path_step + k
+            if (masks[row] >> col) & 1:
+                return frog.path_step + k
+        return None
+
+    def blocked_masks(self, world):
+        """
+        Fonction k -> lanes.WorldTimeline.frog_blocked_masks(k) pour le monde
+        actuel ; les masques sont calculés au premier besoin puis gardés.
+        """
+        timeline = lanes.as_timeline(world.world_sprites(), world.level)
+        cache = {}
+
+        def blocked(k):
+            if k not in cache:
+                cache[k] = timeline.frog_blocked_masks(k, self.swept)
+            return cache[k]
+        return blocked
+
+    def plan(self, world, start_pos_grid, ticks_ahead=0, deadline=None):
+        """
+        Plan (col, row, time) depuis start_pos_grid, occupée dans ticks_ahead
+        ticks, vers le premier nénuphar atteignable. Avec budget_ms, c'est le
+        meilleur plan trouvé avant l'instant deadline (time.perf_counter()).
+        """
+        if self.budget_ms is not None:
+            return self.search(world, start_pos_grid, ticks_ahead).run(deadline)
+        occupancy, start_time = self.occupancy_for(world)
+        goals = world.level.goal_positions()
+        reservations = self.reservations[1] if self.cooperative else None
+        return astar_st.spatio_temporal_astar(start_pos_grid, goals, world.world_sprites(),
+                                              max_time=self.max_time, max_nodes=self.max_nodes,
+                                              occupancy=occupancy, start_time=start_time + ticks_ahead,
+                                              heuristic=heuristic_table(occupancy.timeline, goals),
+                                              stats=self.search_stats, reservations=reservations,
+                                              reservation_tick=world.tick + ticks_ahead,
+                                              sipp=self.sipp and reservations is None)
+
+    def search(self, world, start_pos_grid, ticks_ahead=0):
+        """ La recherche anytime correspondant à plan(), pas encore lancée. """
+        occupancy, start_time = self.occupancy_for(world)
+        goals = world.level.goal_positions()
+        reservations = self.reservations[1] if self.cooperative else None
+        return astar_st.AnytimeSearch(start_pos_grid, goals, world.world_sprites(),
+                                      max_time=self.max_time, occupancy=occupancy,
+                                      start_time=start_time + ticks_ahead,
+                                      heuristic=heuristic_table(occupancy.timeline, goals),
+                                      stats=self.search_stats, reservations=reservations,
+                                      reservation_tick=world.tick + ticks_ahead)
+
+    def improve(self, frog, deadline):
+        """
+        Reprend la recherche anytime du plan de frog jusqu'à deadline et
+        adopte le nouveau meilleur plan s'il commence par les étapes déjà
+        exécutées.
+        """
+        search = self.searches[frog]
+        with instrument.timer('agent.improve'):
+            plan = search.run(deadline)
+        if search.done:
+            del self.searches[frog]
+        step = frog.path_step
+        if plan is not frog.path and len(plan) > step and plan[:step] == frog.path[:step]:
+            frog.path = plan
+
+    def act(self, world, frog):
+        self.act_all(world, [frog])
+
+    def act_all(self, world, frogs):
+        """
+        Met à jour les plans de toutes les grenouilles. Le tableau
+        d'occupation, les masques de validation et la table d'heuristique
+        sont partagés : seule la recherche est propre à chaque grenouille.
+        """
+        blocked = self.blocked_masks(world) if self.validate else None
+        if not self.cooperative:
+            for frog in frogs:
+                self.act_one(world, frog, blocked)
+            return
+
+        # Les grenouilles planifient dans l'ordre de priorité de la liste
+        reservations = self.reservations_for(world)
+        for frog in frogs:
+            self.act_one(world, frog, blocked)
+            if frog.dead:
+                self.release(frog)
+            elif frog not in self.reserved or self.reserved[frog][0] is not frog.path:
+                self.release(frog)
+                # L'étape path_step du plan est exécutée pendant ce tick
+                origin = world.tick - frog.path_step
+                reservations.reserve(frog.path, origin)
+                self.reserved[frog] = (frog.path, origin)
+
+    def reservations_for(self, world):
+        """ La table de réservation du monde, vidée des ticks passés. """
+        if self.reservations is None or self.reservations[0] is not world:
+            self.reservations = (world, astar_st.ReservationTable(world.level.grid_width,
+                                                                  world.level.grid_height))
+            self.reserved = {}
+        reservations = self.reservations[1]
+        reservations.forget_before(world.tick)
+        return reservations
+
+    def release(self, frog):
+        """ Libère les réservations du plan de frog. """
+        if frog in self.reserved:
+            path, origin = self.reserved.pop(frog)
+            self.reservations[1].release(path, origin)
+
+    def forget(self, frog):
+        """ Oublie le plan de frog avant de le remplacer : réservations et recherche anytime. """
+        self.release(frog)
+        self.searches.pop(frog, None)
+
+    def act_one(self, world, frog, blocked):
+        """ Valide, répare ou recalcule le plan d'une grenouille. """
+        # Si la grenouille a terminé son plan, on l'efface pour en calculer un nouveau
+        if frog.path and frog.path_step >= len(frog.path):
+            frog.path = []
+            frog.path_step = 0
+
+        # Sans plan en cours, une recherche anytime part d'une case et d'un tick dépassés
+        if not frog.path or frog.dead:
+            self.searches.pop(frog, None)
+        if frog.dead:
+            return
+
+        # Budget de ce tick pour cette grenouille
+        deadline = None
+        if self.budget_ms is not None:
+            deadline = time.perf_counter() + self.budget_ms / 1000
+        if frog in self.searches:
+            self.improve(frog, deadline)
+
+        if frog.path:
+            if not self.validate:
+                return
+            with instrument.timer('agent.validate'):
+                invalid = self.first_invalid_step(world, frog, blocked)
+            if invalid is None:
+                return
+            self.forget(frog)
+            if invalid > frog.path_step and self.repair(world, frog, invalid, deadline):
+                return
+            # La prochaine étape elle-même n'est plus sûre : plan complet
+            frog.path = []
+
+        self.forget(frog)
+        if self.verbose:
+            print("Calcul d'un nouveau plan spatio-temporel...")
+
+        start_pos_grid = (frog.rect.x // astar_st.TILE_SIZE, frog.rect.y // astar_st.TILE_SIZE)
+
+        # On appelle l'A* spatio-temporel avec l'état initial du monde
+        started = time.perf_counter()
+        with instrument.timer('agent.search'):
+            if self.budget_ms is None:
+                plan = self.plan(world, start_pos_grid)
+            else:
+                search = self.search(world, start_pos_grid)
+                plan = search.run(deadline)
+                # Plan suivi tout de suite, amélioré aux ticks suivants (sauf en
+                # coopératif : les réservations des autres ont pu changer)
+                if not search.done and not self.cooperative:
+                    self.searches[frog] = search
+        self.replan_times.append(time.perf_counter() - started)
+
+        if plan:
+            if self.verbose:
+                print(f"Plan trouvé en {len(plan) - 1} étapes.")
+            frog.path = plan
+        else:
+            if self.verbose:
+                print("Aucun plan trouvé. La grenouille attend un tour.")
+            # Si aucun plan n'est trouvé, on crée un plan "attendre sur place 1 tour"
+            frog.path = [(start_pos_grid[0], start_pos_grid[1], 0)]
+        frog.path_step = 0  # On se prépare à exécuter la première étape
+
+    def repair(self, world, frog, invalid, deadline=None):
+        """
+        Garde les étapes sûres du plan jusqu'à invalid - 1 et recalcule la
+        suite à partir de là. Retourne False si aucune réparation n'est trouvée.
+        """
+        anchor = frog.path[invalid - 1]
+        started = time.perf_counter()
+        with instrument.timer('agent.repair'):
+            suffix = self.plan(world, anchor[0:2], ticks_ahead=invalid - 1 - frog.path_step, deadline=deadline)
+        self.replan_times.append(time.perf_counter() - started)
+        if not suffix:
+            return False
+
+        if self.verbose:
+            print(f"Plan réparé à partir de l'étape {invalid}.")
+        self.repairs += 1
+        # Le premier état de la suite est l'ancre elle-même ; on recale les temps
+        frog.path = frog.path[:invalid] + [(col, row, anchor[2] + t) for col, row, t in suffix[1:]]
+        return True
@@ -1,232 +1,324 @@
-import pygame
+from array import array
+from collections import deque
+import functools
+import heapq
+import itertools
+import numbers
 
-# Taille de chaque case de la grille en pixels
-TILE_SIZE = 25
+import numpy as np
 
-class Node:
+import instrument
+from level import DEFAULT_LEVEL, DIVE_PERIOD, TILE_SIZE
+
+def _sprite_arrays(sprites):
     """
-    Un nœud dans la grille de recherche. Chaque nœud représente une case.
+    Extrait les rectangles et vitesses d'une liste de sprites dans des tableaux NumPy :
+    (row, left, right, speed, state, canDive).
     """
-    def __init__(self, parent=None, position=None):
-        self.parent = parent    # Le nœud parent dans le chemin
-        self.position = position  # Tuple (ligne, colonne)
-
-        # Coûts pour l'algorithme A*
-        self.g = 0  # Coût du chemin depuis le départ jusqu'à ce nœud
-        self.h = 0  # Coût heuristique estimé jusqu'à la fin
-        self.f = 0  # Coût total (g + h)
+    data = np.array([(s.rect.top, s.rect.left, s.rect.right, s.speed,
+                      getattr(s, 'state', 0), getattr(s, 'canDive', 0)) for s in sprites],
+                    dtype=float).reshape(-1, 6)
+    data[:, 0] //= TILE_SIZE
+    return data.T
 
-    def __eq__(self, other):
-        # Un nœud est égal à un autre s'ils ont la même position
-        return self.position == other.position
 
-
-def create_grid(screen_width, screen_height, cars, logs, turtles):
+def fill_intervals(grid_height, grid_width, rows, left, right):
     """
-    Crée une grille 2D représentant l'état actuel du jeu.
-    0 = praticable, 1 = obstacle.
+    Remplissage groupé d'intervalles : retourne un tableau booléen (ligne, colonne)
+    vrai pour chaque case qui chevauche au moins un intervalle de pixels [left, right[.
+    Les intervalles sont limités à la grille, ceux hors grille sont ignorés.
     """
-    grid_width = screen_width // TILE_SIZE
-    grid_height = screen_height // TILE_SIZE
-    grid = [[0 for _ in range(grid_width)] for _ in range(grid_height)]
-
-    # Marque la rivière comme obstacles (lignes 3 à 7)
-    for row in range(3, 8):
-        if 0 <= row < grid_height:
-            for col in range(grid_width):
-                grid[row][col] = 1
-
-    # Surfaces sûres (bûches & tortues non plongeantes)
-    safe_surfaces = pygame.sprite.Group(logs, turtles)
-    for sprite in safe_surfaces:
-        # Tortues plongeantes non sûres
-        if hasattr(sprite, 'state') and sprite.state == 1:
-            continue
-
-        row = sprite.rect.top // TILE_SIZE
-        if not (0 <= row < grid_height):
-            continue
-
-        start_col = sprite.rect.left // TILE_SIZE
-        end_col = (sprite.rect.right - 1) // TILE_SIZE  
-
-
-        start_col = max(0, start_col)
-        end_col = min(grid_width - 1, end_col)
+    start_cols = np.maximum(left // TILE_SIZE, 0).astype(np.intp)
+    end_cols = np.minimum((right - 1) // TILE_SIZE, grid_width - 1).astype(np.intp)
+    rows = rows.astype(np.intp)
+    keep = (rows >= 0) & (rows < grid_height) & (start_cols <= end_cols)
 
-        for col in range(start_col, end_col + 1):
-            grid[row][col] = 0
+    # Tableau de différences : +1 au début de l'intervalle, -1 juste après
+    line = grid_width + 1
+    size = grid_height * line
+    diff = (np.bincount(rows[keep] * line + start_cols[keep], minlength=size)
+            - np.bincount(rows[keep] * line + end_cols[keep] + 1, minlength=size))
+    return np.cumsum(diff.reshape(grid_height, line)[:, :grid_width], axis=1) > 0
 
-    # Traitement des voitures
-    for car in cars:
-        row = car.rect.top // TILE_SIZE
-        if not (0 <= row < grid_height):
-            continue
-
-        start_col = car.rect.left // TILE_SIZE
-        end_col = (car.rect.right - 1) // TILE_SIZE
 
-        start_col = max(0, start_col)
-        end_col = min(grid_width - 1, end_col)
+def _river_mask(grid_height, grid_width, level):
+    river = np.zeros((grid_height, grid_width), dtype=bool)
+    # Marque la rivière comme obstacles (lignes 3 à 7 sur le niveau d'origine)
+    river[level.river_rows.start:level.river_rows.stop, :] = True
+    return river
 
-        for col in range(start_col, end_col + 1):
-            grid[row][col] = 1
 
-    return grid
+def _grid_from_arrays(grid_height, grid_width, surfaces, cars, turtle_counter=None, level=None):
+    """
+    Rastérise les sprites extraits par _sprite_arrays.
+    Si turtle_counter est None, grille de la frame actuelle ; sinon grille
+    prédite à la frame suivante (t+1).
+    """
+    rows, left, right, speed, state, can_dive = surfaces
+    if turtle_counter is None:
+        safe = state != 1  # Tortues plongeantes non sûres
+        shift = 0
+    else:
+        # on prédit le plongeon des tortues à t+1
+        if (turtle_counter + 1) % DIVE_PERIOD == 0:
+            will_dive = (can_dive == 2) & (state == 0)  # va commencer à plonger
+        else:
+            will_dive = (can_dive == 2) & (state == 1)  # reste en plongée
+        safe = ~will_dive
+        shift = speed[safe]
+    safe_cells = fill_intervals(grid_height, grid_width, rows[safe], left[safe] + shift, right[safe] + shift)
+
+    rows, left, right, speed, _, _ = cars
+    shift = 0 if turtle_counter is None else speed
+    car_cells = fill_intervals(grid_height, grid_width, rows, left + shift, right + shift)
+
+    instrument.count('grid_cells_written', grid_height * grid_width)
+    return (_river_mask(grid_height, grid_width, level or DEFAULT_LEVEL) & ~safe_cells) | car_cells
+
+
+def create_grid_array(screen_width, screen_height, cars, logs, turtles, level=None):
+    """
+    Crée une grille 2D (tableau NumPy uint8) représentant l'état actuel du jeu.
+    0 = praticable, 1 = obstacle.
+    level (level.Level) donne les lignes de la rivière, celles du niveau
+    d'origine par défaut.
+    """
+    grid = _grid_from_arrays(screen_height // TILE_SIZE, screen_width // TILE_SIZE,
+                             _sprite_arrays(list(logs) + list(turtles)), _sprite_arrays(cars), level=level)
+    return grid.astype(np.uint8)
 
 
+def create_grid(screen_width, screen_height, cars, logs, turtles, level=None):
+    """
+    Crée une grille 2D représentant l'état actuel du jeu.
+    0 = praticable, 1 = obstacle.
+    Version liste de listes de create_grid_array, pour les anciens appelants.
+    """
+    return create_grid_array(screen_width, screen_height, cars, logs, turtles, level).tolist()
 
 
 # Cette version de create_grid prédit la position des objets à la prochaine frame t+1
 # Elle est utile pour éviter que la grenouille ne meure à cause d'un obstacle qui
 # n'est pas encore là dans la frame actuelle t.
-def create_predictive_grid(screen_width, screen_height, cars, logs, turtles, turtle_counter):
+def create_predictive_grid_array(screen_width, screen_height, cars, logs, turtles, turtle_counter, level=None):
+    """
+    Grille 2D (tableau NumPy uint8) représentant l'état du jeu à la PROCHAINE frame (t+1).
+    0 = praticable, 1 = obstacle.
+    """
+    grid = _grid_from_arrays(screen_height // TILE_SIZE, screen_width // TILE_SIZE,
+                             _sprite_arrays(list(logs) + list(turtles)), _sprite_arrays(cars),
+                             turtle_counter, level)
+    return grid.astype(np.uint8)
+
+
+def create_predictive_grid(screen_width, screen_height, cars, logs, turtles, turtle_counter, level=None):
     """
     Grille 2D représentant l'état du jeu à la PROCHAINE frame (t+1).
     0 = praticable, 1 = obstacle.
+    Version liste de listes de create_predictive_grid_array.
     """
+    return create_predictive_grid_array(screen_width, screen_height, cars, logs, turtles,
+                                        turtle_counter, level).tolist()
+
+
+# version "plus intelligente" de create_grid qui combine les deux fonctions précédentes.
+def conservative_grid_array(screen_width, screen_height, cars, logs, turtles, turtle_counter, level=None):
     grid_width = screen_width // TILE_SIZE
     grid_height = screen_height // TILE_SIZE
-    grid = [[0 for _ in range(grid_width)] for _ in range(grid_height)]
-
-    # Marque la rivière comme obstacles 
-    for row in range(3, 8):
-        if 0 <= row < grid_height:
-            for col in range(grid_width):
-                grid[row][col] = 1
-
-    # Surfaces sûres prédites (bûches & tortues non plongeantes à t+1)
-    safe_surfaces = pygame.sprite.Group(logs, turtles)
-    for sprite in safe_surfaces:
-        # on prédit le plongeon des tortues
-        will_dive = False
-        if hasattr(sprite, 'canDive') and sprite.canDive == 2:
-            if (turtle_counter + 1) % 50 == 0:
-                will_dive = (sprite.state == 0)  # va commencer à plonger
-            else:
-                will_dive = (sprite.state == 1)  # reste en plongée
-
-        if will_dive:
-            continue
+    # Les sprites ne sont extraits qu'une fois pour les deux grilles
+    surfaces = _sprite_arrays(list(logs) + list(turtles))
+    car_arrays = _sprite_arrays(cars)
+    g_now = _grid_from_arrays(grid_height, grid_width, surfaces, car_arrays, level=level)
+    g_next = _grid_from_arrays(grid_height, grid_width, surfaces, car_arrays, turtle_counter, level)
+    # on check s'il y a obstacle maintenant OU à la prochaine frame.
+    return (g_now | g_next).astype(np.uint8)
 
-        # Position future à t+1
-        future_left = sprite.rect.left + sprite.speed
-        future_right = sprite.rect.right + sprite.speed
-        row = sprite.rect.top // TILE_SIZE
-        if not (0 <= row < grid_height):
-            continue
 
-        start_col = int(future_left // TILE_SIZE)
-        end_col = int((future_right - 1) // TILE_SIZE)  
+def conservative_grid(screen_width, screen_height, cars, logs, turtles, turtle_counter, level=None):
+    return conservative_grid_array(screen_width, screen_height, cars, logs, turtles, turtle_counter,
+                                   level).tolist()
 
 
-        start_col = max(0, start_col)
-        end_col = min(grid_width - 1, end_col)
+def goal_set(end):
+    """
+    Accepte un but (col, row) ou une collection de buts et retourne
+    l'ensemble (frozenset) des buts.
+    """
+    if isinstance(end, (tuple, list)) and len(end) == 2 and all(isinstance(v, numbers.Integral) for v in end):
+        return frozenset([tuple(end)])
+    return frozenset(tuple(goal) for goal in end)
 
-        for col in range(start_col, end_col + 1):
-            grid[row][col] = 0
 
-    # Voitures prédites à t+1
-    for car in cars:
-        future_left = car.rect.left + car.speed
-        future_right = car.rect.right + car.speed
-        row = car.rect.top // TILE_SIZE
-        if not (0 <= row < grid_height):
-            continue
+def manhattan_to_goals(goals):
+    """
+    Heuristique admissible vers un ensemble de buts : la distance de
+    Manhattan au but le plus proche, fonction de (col, row).
+    """
+    if len(goals) == 1:
+        (goal_col, goal_row), = goals
+        return lambda col, row: abs(col - goal_col) + abs(row - goal_row)
+    goals = tuple(goals)
+    return lambda col, row: min(abs(col - goal_col) + abs(row - goal_row) for goal_col, goal_row in goals)
 
-        start_col = int(future_left // TILE_SIZE)
-        end_col = int((future_right - 1) // TILE_SIZE)
 
-        start_col = max(0, start_col)
-        end_col = min(grid_width - 1, end_col)
+@functools.lru_cache(maxsize=32)
+def distance_table(passable_masks, grid_width, goals):
+    """
+    Table d'heuristique : distance (en pas) de chaque case au but le plus
+    proche, par un parcours en largeur inverse depuis les buts sur la carte
+    passable_masks (bitmask des cases praticables, une entrée par ligne).
+    table[row][col] vaut None si aucun but n'est atteignable depuis la case.
+    Tant que la carte est un sur-ensemble des cases praticables, la table
+    est une heuristique admissible, plus précise que Manhattan autour des
+    obstacles. Mise en cache par disposition du niveau (carte et buts).
+    """
+    grid_height = len(passable_masks)
+    table = [[None] * grid_width for _ in range(grid_height)]
+    queue = deque()
+    for col, row in goals:
+        if 0 <= col < grid_width and 0 <= row < grid_height and table[row][col] is None:
+            table[row][col] = 0
+            queue.append((col, row))
 
-        for col in range(start_col, end_col + 1):
-            grid[row][col] = 1
+    while queue:
+        col, row = queue.popleft()
+        distance = table[row][col] + 1
+        for dc, dr in ((0, -1), (0, 1), (-1, 0), (1, 0)):
+            c, r = col + dc, row + dr
+            if (0 <= c < grid_width and 0 <= r < grid_height and table[r][c] is None
+                    and (passable_masks[r] >> c) & 1):
+                table[r][c] = distance
+                queue.append((c, r))
 
-    return grid
+    return tuple(tuple(row) for row in table)
 
 
-# version "plus intelligente" de create_grid qui combine les deux fonctions précédentes.
-def conservative_grid(screen_width, screen_height, cars, logs, turtles, turtle_counter):
-    g_now  = create_grid(screen_width, screen_height, cars, logs, turtles)
-    g_next = create_predictive_grid(screen_width, screen_height, cars, logs, turtles, turtle_counter)
-    h, w = len(g_now), len(g_now[0])
-    grid = [[0]*w for _ in range(h)]
-    for r in range(h):
-        for c in range(w):
-            # on check s'il y a obstacle maintenant OU à la prochaine frame.
-            grid[r][c] = 1 if (g_now[r][c] == 1 or g_next[r][c] == 1) else 0
-    return grid
+def grid_passable_masks(grid):
+    """ Carte (bitmask par ligne) des cases praticables d'une grille 0/1. """
+    return tuple(sum(1 << col for col, cell in enumerate(row) if cell == 0) for row in grid)
 
 
-def astar(grid, start, end):
+def astar(grid, start, end, heuristic=None, stats=None):
     """
     Retourne une liste de tuples (ligne, colonne) représentant le chemin du début à la fin.
-    Utilise l'algorithme A*
+    Utilise l'algorithme A* avec un tas binaire comme open list (suppression
+    paresseuse des doublons). L'état de la recherche est rangé dans des
+    tableaux plats indexés par le numéro de case (row * largeur + col) :
+    meilleur g, case parente et drapeau de case visitée.
+    end est un but (col, row) ou une collection de buts : la recherche
+    s'arrête alors sur le but atteignable le plus proche.
+    heuristic est une table de distance_table (Manhattan par défaut) ; les
+    cases sans distance y sont ignorées. Si stats est un dict, on y ajoute
+    le nombre de nœuds développés ('expanded') et ajoutés ('pushed').
     """
-    start_node = Node(None, start)
-    end_node = Node(None, end)
-
-    open_list = []  # Liste des nœuds à visiter
-    closed_list = [] # Liste des nœuds déjà visités
-
-    open_list.append(start_node)
-
-    while open_list:
-        # Trouve le nœud avec le coût F le plus bas dans la open_list
-        current_node = open_list[0]
-        current_index = 0
-        for index, item in enumerate(open_list):
-            if item.f < current_node.f:
-                current_node = item
-                current_index = index
-
-        # Déplace le nœud actuel de open_list à closed_list
-        open_list.pop(current_index)
-        closed_list.append(current_node)
+    grid_height = len(grid)
+    grid_width = len(grid[0])
+    cell_count = grid_width * grid_height
+
+    goals = goal_set(end)
+    if heuristic is None:
+        # Heuristique: Distance de Manhattan (au but le plus proche)
+        heuristic = manhattan_to_goals(goals)
+    else:
+        table = heuristic
+        heuristic = lambda col, row: table[row][col]
+    expanded = pushed = 0
+    # Départ hors de la grille (grenouille emportée au bord) : il faut au moins
+    # rentrer dans la grille, la table n'a pas de valeur au-delà
+    col = min(max(start[0], 0), grid_width - 1)
+    row = min(max(start[1], 0), grid_height - 1)
+    start_h = heuristic(col, row)
+    if start_h is None:
+        _record_stats(stats, expanded, pushed)
+        return None
+    start_h += abs(start[0] - col) + abs(start[1] - row)
+
+    # 0 = praticable, une case par octet
+    if isinstance(grid, np.ndarray):
+        blocked = (grid != 0).tobytes()
+    else:
+        blocked = b''.join(map(bytes, grid))
+    goal_cells = {row * grid_width + col for col, row in goals}
+    # Une case de plus pour un départ hors de la grille (grenouille emportée au bord)
+    outside = cell_count
+    best_g = array('i', [-1]) * (cell_count + 1)   # Meilleur coût g connu (-1 = inconnu)
+    parents = array('i', [-1]) * (cell_count + 1)  # Case parente sur le meilleur chemin connu
+    closed = bytearray(cell_count + 1)             # 1 = case déjà visitée
+
+    # Chaque entrée du tas est un seul entier : f, puis l'ordre d'insertion
+    # (comme l'ancien parcours linéaire), puis la case. g se relit dans best_g.
+    # Chaque case développée ajoute au plus 4 entrées : l'ordre d'insertion
+    # tient dans order_bits bits et ne déborde jamais sur f.
+    order_shift = outside.bit_length()
+    order_bits = (4 * (cell_count + 1) + 1).bit_length()
+    f_shift = order_shift + order_bits
+    cell_mask = (1 << order_shift) - 1
+    counter = itertools.count()
+    if 0 <= start[0] < grid_width and 0 <= start[1] < grid_height:
+        start_cell = start[1] * grid_width + start[0]
+    else:
+        start_cell = outside
+    best_g[start_cell] = 0
+    open_heap = [(start_h << f_shift) | (next(counter) << order_shift) | start_cell]
+
+    while open_heap:
+        # Récupère le nœud avec le coût F le plus bas
+        cell = heapq.heappop(open_heap) & cell_mask
+
+        # Entrée périmée : la case a déjà été visitée avec un meilleur coût
+        if closed[cell]:
+            continue
+        closed[cell] = 1
+        expanded += 1
 
         # Vérifie si on a atteint la fin
-        if current_node == end_node:
+        if cell in goal_cells:
+            _record_stats(stats, expanded, pushed)
             path = []
-            current = current_node
-            while current is not None:
-                path.append(current.position)
-                current = current.parent
+            while cell != -1:
+                path.append((cell % grid_width, cell // grid_width) if cell != outside else start)
+                cell = parents[cell]
             return path[::-1]  # Retourne le chemin inversé (du début à la fin)
 
-        # Génère les voisins (enfants)
-        children = []
-        for new_position in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
-            node_position = (current_node.position[0] + new_position[0], current_node.position[1] + new_position[1])
-
-            # S'assure que le voisin est dans les limites de la grille
-            if not (0 <= node_position[0] < len(grid[0]) and 0 <= node_position[1] < len(grid)):
+        child_g = best_g[cell] + 1
+        if cell != outside:
+            row, col = divmod(cell, grid_width)
+            neighbours = ((cell - grid_width, col, row - 1), (cell + grid_width, col, row + 1),
+                          (cell - 1, col - 1, row), (cell + 1, col + 1, row))
+        else:
+            col, row = start
+            neighbours = tuple((child_row * grid_width + child_col, child_col, child_row)
+                               for child_col, child_row in ((col, row - 1), (col, row + 1),
+                                                            (col - 1, row), (col + 1, row)))
+
+        # On traite les voisins (haut, bas, gauche, droite) qui restent dans la grille
+        for child, child_col, child_row in neighbours:
+            if not (0 <= child_col < grid_width and 0 <= child_row < grid_height):
                 continue
 
-            # S'assure que le voisin est une case praticable
-            if grid[node_position[1]][node_position[0]] != 0:
+            # Case praticable, pas encore visitée, et pas déjà connue avec un meilleur coût
+            if blocked[child] or closed[child]:
+                continue
+            known_g = best_g[child]
+            if known_g != -1 and known_g <= child_g:
                 continue
 
-            new_node = Node(current_node, node_position)
-            children.append(new_node)
+            h = heuristic(child_col, child_row)
+            if h is None:
+                continue  # Aucun but atteignable depuis cette case
 
-        # On traite les voisins
-        for child in children:
-            # Si le voisin est déjà dans la closed_list, on l'ignore
-            if child in closed_list:
-                continue
+            best_g[child] = child_g
+            parents[child] = cell
+            pushed += 1
+            heapq.heappush(open_heap, ((child_g + h) << f_shift) | (next(counter) << order_shift) | child)
 
-            # Calcule les coûts g, h, et f
-            child.g = current_node.g + 1
-            # Heuristique: Distance de Manhattan
-            child.h = abs(child.position[0] - end_node.position[0]) + abs(child.position[1] - end_node.position[1])
-            child.f = child.g + child.h
+    _record_stats(stats, expanded, pushed)
+    return None # Retourne None si aucun chemin n'est trouvé
 
-            # Si le voisin est déjà dans open_list avec un meilleur coût g, on l'ignore
-            if any(open_node for open_node in open_list if child == open_node and child.g >= open_node.g):
-                continue
-            
-            # On ajoute donc ici le voisin à la open_list
-            open_list.append(child)
-            
-    return None # Retourne None si aucun chemin n'est trouvé
\ No newline at end of file
+
+def _record_stats(stats, expanded, pushed):
+    instrument.count('astar.expanded', expanded)
+    instrument.count('astar.pushed', pushed)
+    if stats is not None:
+        stats['expanded'] = stats.get('expanded', 0) + expanded
+        stats['pushed'] = stats.get('pushed', 0) + pushed
@@ -1,140 +1,628 @@
 # astar_spatiotemporal.py
 
-import pygame
+import bisect
+import heapq
+import itertools
+from array import array
+from time import perf_counter
 
-# Taille de chaque case de la grille en pixels
-TILE_SIZE = 25
+import instrument
+import lanes
+from astar import goal_set, manhattan_to_goals
+from level import TILE_SIZE
 
-def is_walkable_at_time(pos_xy, time, world_sprites):
+def is_walkable_at_time(pos_xy, time, world_sprites, level=None, lane_index=None):
     """
     Vérifie si une case (col, row) est sûre à un instant 'time' donné.
     Retourne True si la case est sûre, False sinon.
+    La prédiction passe par le cache des voies (lanes.py) : elle tient compte
+    du bouclage des sprites au bord de l'écran et de l'état des tortues.
+    Pour de nombreuses requêtes, préférer OccupancyTensor.
+    level est le plateau (level.Level), le niveau d'origine par défaut.
+    Avec lane_index (lanes.LaneIndex, voir World.lane_index), seules les
+    voies de la ligne demandée sont lues.
+    L'appel est compté dans 'walkability_calls' par WorldTimeline.is_walkable.
     """
     col, row = pos_xy
-    cars, logs, turtles, turtle_counter_start = world_sprites
-
-    grid_width = 350 // TILE_SIZE
-    grid_height = 400 // TILE_SIZE
-
-    # On vérifie les limites de la grille
-    if not (0 <= col < grid_width and 0 <= row < grid_height):
-        return False
-
-    # On vérifie si la case est occupée par une voiture
-    for car in cars:
-        if car.rect.top // TILE_SIZE == row:
-            # On calcule la position future de la voiture
-            future_left = car.rect.left + car.speed * time
-            future_right = car.rect.right + car.speed * time
-            # On vérifie si la colonne de la case est dans l'intervalle de la voiture
-            if future_left <= (col + 1) * TILE_SIZE and future_right >= col * TILE_SIZE:
-                return False # Collision avec une voiture 
-
-    # On vérifie si la case est dans la rivière (lignes 3 à 7)
-    if 3 <= row <= 7:
-        is_safe_surface = False
-        # On vérifie si une bûche sera là
-        for log in logs:
-            if log.rect.top // TILE_SIZE == row:
-                future_left = log.rect.left + log.speed * time
-                future_right = log.rect.right + log.speed * time
-                if future_left <= (col + 1) * TILE_SIZE and future_right >= col * TILE_SIZE:
-                    is_safe_surface = True
-                    break
-        
-        # Si pas sur une bûche, vérifie pour une tortue
-        if not is_safe_surface:
-            for turtle in turtles:
-                if turtle.rect.top // TILE_SIZE == row:
-                    # Prédire si la tortue plonge
-                    if turtle.canDive == 2:
-                        # Le cycle de plongée est de 50 frames.
-                        # Le nombre de cycles de plongée complets au temps 'time'
-                        num_dive_cycles = (turtle_counter_start + time) // 50
-                        is_diving = (num_dive_cycles % 2 != 0)
-                    else:
-                        is_diving = False
-
-                    if not is_diving:
-                        future_left = turtle.rect.left + turtle.speed * time
-                        future_right = turtle.rect.right + turtle.speed * time
-                        if future_left <= (col + 1) * TILE_SIZE and future_right >= col * TILE_SIZE:
-                            is_safe_surface = True
-                            break
-        
-        return is_safe_surface # True si sur une surface sûre, False si dans l'eau
-
-    # Si ce n'est ni une voiture ni la rivière, c'est une route sûre
-    return True
-
-
-class Node:
-    """ Un nœud dans la recherche spatio-temporelle. """
-    def __init__(self, parent=None, position=None):
-        self.parent = parent
-        self.position = position  # Tuple (col, row, time)
-
-        self.g = 0  # Coût du chemin (équivalent au temps)
-        self.h = 0  # Heuristique (estimation du temps restant)
-        self.f = 0  # Coût total (g + h)
-
-    def __eq__(self, other):
-        return self.position == other.position
-
-
-def spatio_temporal_astar(start_pos, end_pos, world_sprites, max_time=100):
+    if lane_index is not None:
+        world_sprites = lane_index.row_sprites(row, world_sprites)
+    return lanes.WorldTimeline(world_sprites, level).is_walkable(col, row, time)
+
+
+class OccupancyTensor:
     """
-    Trouve un chemin optimal dans l'espace-temps (col, row, time).
-    start_pos et end_pos sont en (col, row).
+    Tableau (time x row x col) précalculé des cases sûres, construit une seule
+    fois par plan à partir de world_sprites. Donne les mêmes réponses que
+    is_walkable_at_time, mais en O(1).
+    Les couches sont calculées à la demande ; le tableau peut être réutilisé
+    d'un plan à l'autre (paramètre start_time de spatio_temporal_astar) et
+    prolongé avec extend().
+    Avec exact=True, la couche `time` donne plutôt les cases où la grenouille
+    survit réellement si le plan l'y place pendant le tick time -> time+1
+    (voir lanes.WorldTimeline.frog_blocked_masks) ; avec swept=True en plus,
+    une voiture bloque aussi les cases qu'elle balaie entre deux ticks.
     """
-    start_node = Node(None, (start_pos[0], start_pos[1], 0))
-    end_pos_xy = end_pos 
+    def __init__(self, world_sprites, max_time=100, cache=None, exact=False, level=None, swept=False):
+        self.exact = exact
+        self.swept = swept
+        # La WorldTimeline photographie l'état des voies : le tableau ne dépend
+        # plus du monde qui continue de bouger. world_sprites peut aussi être
+        # une WorldTimeline déjà construite.
+        self.timeline = lanes.as_timeline(world_sprites, level, cache)
+        self.grid_width = self.timeline.grid_width
+        self.grid_height = self.timeline.grid_height
+        self.layer_size = self.grid_width * self.grid_height
+        self.row_bytes = {}  # bitmask des cases dangereuses -> ligne de 0/1
 
-    open_list = []
-    closed_list = set() # un set pour des recherches rapides
+        self.max_time = -1
+        self.data = bytearray()  # 1 = case sûre, 0 = danger, indexé par (time, row, col)
+        self.intervals = None    # lanes.SafeIntervals de la même règle, calculés à la demande
+        self.extend(max_time)
 
-    open_list.append(start_node)
+    def blocked_masks(self, time):
+        """ Bitmasks des cases dangereuses de chaque ligne à l'instant time, selon la règle du tableau. """
+        if self.exact:
+            return self.timeline.frog_blocked_masks(time, self.swept)
+        return self.timeline.blocked_masks(time, inclusive=True)
 
-    while open_list:
-        # Trouve le meilleur nœud ie plus petit f dans open_list
-        open_list.sort(key=lambda x: x.f)
-        current_node = open_list.pop(0)
+    def safe_intervals(self, max_time):
+        """
+        Les intervalles sûrs de chaque case (lanes.SafeIntervals) jusqu'à
+        max_time au moins, avec la même règle que les couches du tableau.
+        Ils sont gardés et prolongés d'un appel à l'autre.
+        """
+        if self.intervals is None:
+            self.intervals = lanes.SafeIntervals(self.timeline, max_time, blocked_masks=self.blocked_masks)
+        elif max_time > self.intervals.max_time:
+            self.intervals.extend(max_time)
+        return self.intervals
 
-        # Si on a déjà visité cet état (pos, time), on passe
-        if current_node.position in closed_list:
-            continue
-        closed_list.add(current_node.position)
+    def _row_bytes(self, blocked_mask):
+        row = self.row_bytes.get(blocked_mask)
+        if row is None:
+            row = bytes(1 - ((blocked_mask >> col) & 1) for col in range(self.grid_width))
+            self.row_bytes[blocked_mask] = row
+        return row
+
+    def extend(self, max_time):
+        """ Calcule les couches manquantes jusqu'à max_time inclus. """
+        for time in range(self.max_time + 1, max_time + 1):
+            for blocked_mask in self.blocked_masks(time):
+                self.data += self._row_bytes(blocked_mask)
+            instrument.count('grid_cells_written', self.layer_size)
+
+        self.max_time = max(self.max_time, max_time)
+
+    def is_walkable(self, col, row, time):
+        instrument.count('walkability_calls')
+        if not (0 <= col < self.grid_width and 0 <= row < self.grid_height):
+            return False
+        if time > self.max_time:
+            self.extend(time)
+        return self.data[time * self.layer_size + row * self.grid_width + col] == 1
+
+
+class ReservationTable:
+    """
+    Réservations espace-temps partagées entre grenouilles qui planifient
+    l'une après l'autre (planification coopérative) : un plan réservé
+    interdit aux plans suivants d'occuper la même case au même tick
+    (conflit de sommet) et d'échanger deux cases pendant le même tick
+    (conflit d'arête).
+    Les ticks sont absolus (World.tick). Pour chaque tick, un tableau de
+    compteurs par case (array 'H') et un dict des déplacements réservés ;
+    forget_before() libère les ticks passés.
+    """
+    def __init__(self, grid_width, grid_height):
+        self.grid_width = grid_width
+        self.layer_size = grid_width * grid_height
+        self.vertices = {}  # tick -> nombre de grenouilles par case (row * grid_width + col)
+        self.edges = {}     # tick -> {case de départ * layer_size + case d'arrivée: nombre}
+
+    def _add(self, path, origin, delta):
+        # L'état (col, row, t) de path est occupé au tick origin + t
+        grid_width, layer_size = self.grid_width, self.layer_size
+        previous = None
+        for col, row, t in path:
+            if not 0 <= col < grid_width:
+                previous = None  # grenouille emportée hors de l'écran
+                continue
+            tick = origin + t
+            cell = row * grid_width + col
+            layer = self.vertices.get(tick)
+            if layer is None:
+                if delta < 0:
+                    previous = cell
+                    continue  # tick déjà oublié
+                layer = self.vertices[tick] = array('H', bytes(2 * layer_size))
+            layer[cell] += delta
+
+            if previous is not None and previous != cell:
+                edges = self.edges.setdefault(tick, {})
+                key = previous * layer_size + cell
+                count = edges.get(key, 0) + delta
+                if count:
+                    edges[key] = count
+                else:
+                    del edges[key]
+            previous = cell
+
+    def reserve(self, path, origin):
+        """ Réserve les états (col, row, t) de path, t étant compté à partir du tick origin. """
+        self._add(path, origin, 1)
+
+    def release(self, path, origin):
+        """ Annule reserve(path, origin). """
+        self._add(path, origin, -1)
+
+    def conflict(self, col, row, new_col, new_row, tick):
+        """
+        Le déplacement de (col, row) vers (new_col, new_row), qui arrive au
+        tick `tick`, croise-t-il un plan réservé ?
+        """
+        new_cell = new_row * self.grid_width + new_col
+        layer = self.vertices.get(tick)
+        if layer is not None and layer[new_cell]:
+            return True
+        edges = self.edges.get(tick)
+        return bool(edges) and (new_cell * self.layer_size + row * self.grid_width + col) in edges
+
+    def forget_before(self, tick):
+        """ Oublie les réservations des ticks antérieurs à tick. """
+        for old in [t for t in self.vertices if t < tick]:
+            del self.vertices[old]
+            self.edges.pop(old, None)
+
+
+def _search(start_pos, occupancy, start_time, max_time, heuristic, parents, epsilon=1,
+            bound=None, max_nodes=None, reservations=None, reservation_tick=0, chunk=None):
+    """
+    Cœur de la recherche spatio-temporelle, sous forme de générateur : si
+    chunk est donné, il rend la main (yield de l'état partiel le plus proche
+    du but) toutes les chunk expansions, ce qui permet de l'interrompre et de
+    la reprendre. Les états sont classés par time + epsilon * h (A* pondéré
+    si epsilon > 1) ; ceux qui ne peuvent pas arriver avant le temps bound
+    sont écartés.
+    Un état (col, row, time) est codé par l'entier time * layer_size +
+    row * grid_width + col, comme dans occupancy.data ; parents (état ->
+    état parent, -1 pour le départ) est rempli au fur et à mesure.
+    epsilon est arrondi au quart.
+    Retourne (état but ou None, meilleur état partiel, budget max_nodes
+    épuisé, développés, ajoutés, cases vérifiées).
+    """
+    # Accès direct au tableau dans la boucle chaude (extend() le modifie sur place)
+    data = occupancy.data
+    layer_size = occupancy.layer_size
+    grid_width = occupancy.grid_width
+    grid_height = occupancy.grid_height
+    data_offset = start_time * layer_size  # le temps 0 du plan dans occupancy.data
+
+    # Chaque entrée du tas est un seul entier (f, h, ordre, état), comparé
+    # dans cet ordre : à f égal, on préfère l'état le plus proche du but.
+    # f est compté en quarts de tick pour que epsilon * h reste entier.
+    weight = round(epsilon * 4)
+    outside = (max_time + 1) * layer_size  # code du départ s'il est hors de la grille
+    state_bits = (outside + 1).bit_length()
+    state_mask = (1 << state_bits) - 1
+    # Chaque état est ajouté au plus une fois : l'ordre d'insertion ne
+    # dépasse pas le nombre d'états et tient lui aussi dans state_bits bits
+    h_shift = 2 * state_bits
+    h_mask = (1 << (layer_size + grid_width + grid_height).bit_length()) - 1
+    f_shift = h_shift + h_mask.bit_length()
+    counter = itertools.count()
+    start_col, start_row = start_pos
+    if 0 <= start_col < grid_width and 0 <= start_row < grid_height:
+        start_state = start_row * grid_width + start_col
+        start_h = heuristic(start_col, start_row)
+    else:
+        # Grenouille emportée au bord de l'écran : il faut au moins rentrer
+        # dans la grille, puis aller de la case la plus proche jusqu'au but
+        # (la table n'a pas de valeur hors de la grille)
+        start_state = outside
+        col = min(max(start_col, 0), grid_width - 1)
+        row = min(max(start_row, 0), grid_height - 1)
+        start_h = heuristic(col, row)
+        if start_h is not None:
+            start_h += abs(start_col - col) + abs(start_row - row)
+    if start_h is None:
+        open_heap = []  # Aucun but atteignable depuis le départ
+    else:
+        open_heap = [(weight * start_h << f_shift) | (start_h << h_shift) | (next(counter) << state_bits)
+                     | start_state]
+    # Le coût g d'un état est son temps : un état n'est donc jamais
+    # retrouvé avec un meilleur coût, et on peut l'ignorer dès le 2e ajout.
+    parents[start_state] = -1
+
+    best_state, best_key = start_state, (start_h, 0)
+    expanded = pushed = checks = 0
+
+    while open_heap:
+        entry = heapq.heappop(open_heap)
+        h = (entry >> h_shift) & h_mask
+        current = entry & state_mask
 
         # Condition de victoire : on a atteint les coordonnées du but
-        if current_node.position[0:2] == end_pos_xy:
-            path = []
-            current = current_node
-            while current is not None:
-                path.append(current.position)
-                current = current.parent
-            return path[::-1] # Retourne le plan complet (col, row, time)
-
-        # Génère les 5 mouvements possibles
-        children = []
-
-        for move in [(0, 0), (0, -1), (0, 1), (-1, 0), (1, 0)]: 
-            pos = current_node.position
-            new_pos = (pos[0] + move[0], pos[1] + move[1], pos[2] + 1)
-
-            # Ne pas chercher un plan trop loin dans le futur
-            if new_pos[2] > max_time:
+        if h == 0:
+            return current, best_state, False, expanded, pushed, checks
+
+        if current != outside:
+            time, cell = divmod(current, layer_size)
+            row, col = divmod(cell, grid_width)
+        else:
+            time, col, row = 0, start_col, start_row
+            cell = row * grid_width + col
+        if (h, time) < best_key:
+            best_state, best_key = current, (h, time)
+
+        # Budget de nœuds épuisé : on retourne le meilleur plan partiel
+        if max_nodes is not None and expanded >= max_nodes:
+            return None, best_state, True, expanded, pushed, checks
+        expanded += 1
+        if chunk is not None and expanded % chunk == 0:
+            yield best_state
+
+        # Ne pas chercher un plan trop loin dans le futur
+        time += 1
+        if time > max_time:
+            continue
+        if start_time + time > occupancy.max_time:
+            occupancy.extend(start_time + time)
+            # Une couche du tableau coûte bien plus qu'une expansion : on
+            # rend aussi la main après chacune
+            if chunk is not None:
+                yield best_state
+
+        # Génère les 5 mouvements possibles : attendre, haut, bas, gauche, droite
+        layer = time * layer_size
+        for new_cell, new_col, new_row in ((cell, col, row),
+                                           (cell - grid_width, col, row - 1),
+                                           (cell + grid_width, col, row + 1),
+                                           (cell - 1, col - 1, row),
+                                           (cell + 1, col + 1, row)):
+            new_state = layer + new_cell
+            if new_state in parents:
                 continue
-            
+
             # Vérifie si la nouvelle position est sûre à ce temps
-            if not is_walkable_at_time(new_pos[0:2], new_pos[2], world_sprites):
+            if not (0 <= new_col < grid_width and 0 <= new_row < grid_height):
+                continue
+            checks += 1
+            if not data[data_offset + new_state]:
+                continue
+            if reservations is not None and reservations.conflict(col, row, new_col, new_row,
+                                                                  reservation_tick + time):
+                continue
+
+            h = heuristic(new_col, new_row)
+            if h is None:
+                continue  # Aucun but atteignable depuis cette case
+            if bound is not None and time + h >= bound:
+                continue  # Ne peut pas battre le meilleur plan déjà trouvé
+
+            parents[new_state] = current
+            pushed += 1
+            heapq.heappush(open_heap, ((4 * time + weight * h) << f_shift) | (h << h_shift)
+                           | (next(counter) << state_bits) | new_state)
+
+    return None, best_state, False, expanded, pushed, checks # Aucun chemin trouvé dans l'horizon de temps
+
+
+def _build_path(parents, state, occupancy, start_pos):
+    """ Le plan [(col, row, time), ...] qui mène à l'état codé state. """
+    path = []
+    while parents[state] != -1:
+        time, cell = divmod(state, occupancy.layer_size)
+        row, col = divmod(cell, occupancy.grid_width)
+        path.append((col, row, time))
+        state = parents[state]
+    path.append((start_pos[0], start_pos[1], 0))  # le départ, éventuellement hors de la grille
+    return path[::-1]
+
+
+# Premier horizon (en ticks) des recherches SIPP, doublé jusqu'à max_time
+SIPP_WINDOW = 64
+
+
+def _sipp_search(start_pos, occupancy, start_time, max_time, heuristic, parents, arrivals, max_nodes=None):
+    """
+    Recherche SIPP (Safe Interval Path Planning) : un état est une case et
+    l'un de ses intervalles sûrs (occupancy.safe_intervals), atteint au plus
+    tôt. Attendre dans une case jusqu'à la fin de son intervalle ne crée
+    aucun état : d'un état, on part vers chaque voisine à n'importe quel
+    instant de l'intervalle, ce qui donne un état par intervalle de la
+    voisine qu'on peut rejoindre. Arriver plus tôt dans un intervalle n'est
+    jamais moins bien (on peut y attendre) : les plans arrivent au but au
+    même tick que ceux de _search, pour bien moins d'expansions.
+    L'état (case, intervalle i) est codé (i + 1) * (cases + 1) + case ;
+    i = -1 est le départ quand sa case n'est pas sûre (il faut la quitter
+    ou y attendre un intervalle sûr dès le tick suivant), et la case
+    d'indice « cases » est le départ hors de la grille.
+    parents (état -> état parent, -1 pour le départ) et arrivals (état ->
+    instant d'arrivée dans occupancy) sont remplis au fur et à mesure.
+    Retourne (état but ou None, meilleur état partiel, budget max_nodes
+    épuisé, développés, ajoutés, cases vérifiées).
+    """
+    horizon = start_time + max_time
+    intervals = occupancy.safe_intervals(horizon)
+    starts, ends = intervals.starts, intervals.ends
+    grid_width = occupancy.grid_width
+    grid_height = occupancy.grid_height
+    slots = occupancy.layer_size + 1
+    outside = occupancy.layer_size
+
+    counter = itertools.count()
+    start_col, start_row = start_pos
+    if 0 <= start_col < grid_width and 0 <= start_row < grid_height:
+        start_cell = start_row * grid_width + start_col
+        start_interval = intervals.interval(start_col, start_row, start_time)
+        start_state = (0 if start_interval is None else start_interval + 1) * slots + start_cell
+        start_h = heuristic(start_col, start_row)
+    else:
+        # Départ hors de la grille : même heuristique que _search
+        start_state = outside
+        col = min(max(start_col, 0), grid_width - 1)
+        row = min(max(start_row, 0), grid_height - 1)
+        start_h = heuristic(col, row)
+        if start_h is not None:
+            start_h += abs(start_col - col) + abs(start_row - row)
+    open_heap = [] if start_h is None else [(start_h, start_h, next(counter), start_state)]
+    parents[start_state] = -1
+    arrivals[start_state] = start_time
+    closed = set()
+
+    best_state, best_key = start_state, (start_h, start_time)
+    expanded = pushed = checks = 0
+
+    while open_heap:
+        _, h, _, current = heapq.heappop(open_heap)
+        if current in closed:
+            continue  # déjà développé avec une arrivée plus tôt
+        closed.add(current)
+        time = arrivals[current]
+
+        if h == 0:
+            return current, best_state, False, expanded, pushed, checks
+        if (h, time) < best_key:
+            best_state, best_key = current, (h, time)
+
+        if max_nodes is not None and expanded >= max_nodes:
+            return None, best_state, True, expanded, pushed, checks
+        expanded += 1
+
+        interval, cell = divmod(current, slots)
+        interval -= 1
+        if cell == outside:
+            col, row = start_col, start_row
+        else:
+            row, col = divmod(cell, grid_width)
+        moves = ((col, row - 1), (col, row + 1), (col - 1, row), (col + 1, row))
+        if interval >= 0:
+            end = intervals.end(cell, interval)
+        else:
+            # Départ hors de la grille ou dans une case dangereuse : pas
+            # d'attente, sauf vers un intervalle sûr de la même case au tick suivant
+            end = time
+            moves += ((col, row),)
+
+        # Départ entre time et la fin de l'intervalle : arrivée entre earliest et latest
+        earliest = time + 1
+        latest = min(end + 1, horizon)
+        if earliest > latest:
+            continue
+
+        for new_col, new_row in moves:
+            if not (0 <= new_col < grid_width and 0 <= new_row < grid_height):
                 continue
-            
-            children.append(Node(current_node, new_pos))
-        
-        for child in children:
-            child.g = child.position[2] 
-            child.h = abs(child.position[0] - end_pos_xy[0]) + abs(child.position[1] - end_pos_xy[1])
-            child.f = child.g + child.h
-            open_list.append(child)
-
-    return None # Aucun chemin trouvé dans l'horizon de temps
\ No newline at end of file
+            new_cell = new_row * grid_width + new_col
+            checks += 1
+            new_h = heuristic(new_col, new_row)
+            if new_h is None:
+                continue  # Aucun but atteignable depuis cette case
+
+            # Intervalles de la voisine qui recoupent [earliest, latest]
+            cell_starts = starts[new_cell]
+            cell_ends = ends[new_cell]
+            i = bisect.bisect_right(cell_starts, earliest) - 1
+            if i < 0 or (i < len(cell_ends) and cell_ends[i] < earliest):
+                i += 1
+            while i < len(cell_starts) and cell_starts[i] <= latest:
+                arrival = max(earliest, cell_starts[i])
+                new_state = (i + 1) * slots + new_cell
+                i += 1
+                if new_state in closed or arrival >= arrivals.get(new_state, horizon + 1):
+                    continue
+                arrivals[new_state] = arrival
+                parents[new_state] = current
+                pushed += 1
+                heapq.heappush(open_heap, (arrival - start_time + new_h, new_h, next(counter), new_state))
+
+    return None, best_state, False, expanded, pushed, checks
+
+
+def _build_sipp_path(parents, arrivals, state, occupancy, start_pos, start_time):
+    """ Le plan [(col, row, time), ...] tick par tick qui mène à l'état SIPP state. """
+    chain = []
+    while parents[state] != -1:
+        chain.append(state)
+        state = parents[state]
+    slots = occupancy.layer_size + 1
+    path = [(start_pos[0], start_pos[1], 0)]
+    for state in reversed(chain):
+        row, col = divmod(state % slots, occupancy.grid_width)
+        time = arrivals[state] - start_time
+        # Attente dans la case précédente jusqu'au départ
+        previous_col, previous_row, _ = path[-1]
+        while len(path) < time:
+            path.append((previous_col, previous_row, len(path)))
+        path.append((col, row, time))
+    return path
+
+
+def _heuristic_function(end_pos, heuristic):
+    """ La table de astar.distance_table sous forme de fonction de (col, row), ou Manhattan vers les buts. """
+    if heuristic is None:
+        return manhattan_to_goals(goal_set(end_pos))
+    table = heuristic
+    return lambda col, row: table[row][col]
+
+
+def _record(stats, expanded, pushed, checks):
+    instrument.count('spatio.expanded', expanded)
+    instrument.count('spatio.pushed', pushed)
+    instrument.count('walkability_calls', checks)
+    if stats is not None:
+        stats['expanded'] = stats.get('expanded', 0) + expanded
+        stats['pushed'] = stats.get('pushed', 0) + pushed
+
+
+def spatio_temporal_astar(start_pos, end_pos, world_sprites, max_time=100, max_nodes=None,
+                          occupancy=None, start_time=0, heuristic=None, stats=None, level=None,
+                          reservations=None, reservation_tick=0, sipp=False):
+    """
+    Trouve un chemin optimal dans l'espace-temps (col, row, time).
+    start_pos est en (col, row) ; end_pos est un but (col, row) ou une
+    collection de buts (le plan mène au premier but atteignable).
+    Si max_nodes est donné, la recherche s'arrête après ce nombre d'expansions
+    et retourne le meilleur plan partiel (l'état le plus proche du but).
+    occupancy est un OccupancyTensor à réutiliser (construit à partir de
+    world_sprites sinon) ; start_time est l'instant du tableau qui correspond
+    au temps 0 du plan.
+    heuristic est une table de astar.distance_table (Manhattan par défaut) ;
+    si stats est un dict, on y ajoute les nœuds développés et ajoutés.
+    level est le plateau (level.Level) utilisé pour construire occupancy.
+    reservations est une ReservationTable dont les plans sont évités ; le
+    temps 0 du plan correspond à son tick reservation_tick.
+    Avec sipp=True, la recherche porte sur les intervalles sûrs de chaque
+    case au lieu de chaque tick (voir _sipp_search) : même instant
+    d'arrivée, bien moins d'expansions, ce qui rend abordables des horizons
+    max_time de plusieurs milliers de ticks. Ce mode ne prend pas en charge
+    reservations.
+    Pour une recherche interruptible, voir AnytimeSearch.
+    """
+    if occupancy is None:
+        occupancy = OccupancyTensor(world_sprites, start_time, level=level)
+
+    if sipp:
+        if reservations is not None:
+            raise ValueError("le mode SIPP ne prend pas en charge les réservations")
+        # Horizon doublé tant qu'aucun plan n'arrive : un plan trouvé dans un
+        # horizon plus court est déjà optimal, et les intervalles ne sont
+        # calculés que jusqu'où la recherche en a besoin. max_nodes borne les
+        # expansions de toutes les fenêtres ensemble.
+        window = min(max_time, SIPP_WINDOW)
+        remaining = max_nodes
+        while True:
+            parents, arrivals = {}, {}
+            goal_state, best_state, out_of_nodes, expanded, pushed, checks = _sipp_search(
+                start_pos, occupancy, start_time, window, _heuristic_function(end_pos, heuristic),
+                parents, arrivals, max_nodes=remaining)
+            _record(stats, expanded, pushed, checks)
+            if remaining is not None:
+                remaining -= expanded
+                out_of_nodes = out_of_nodes or remaining <= 0
+            if goal_state is not None or out_of_nodes or window >= max_time:
+                break
+            window = min(max_time, 2 * window)
+        if goal_state is not None or out_of_nodes:
+            state = goal_state if goal_state is not None else best_state
+            return _build_sipp_path(parents, arrivals, state, occupancy, start_pos, start_time)
+        return None
+
+    parents = {}
+    search = _search(start_pos, occupancy, start_time, max_time,
+                     _heuristic_function(end_pos, heuristic), parents, max_nodes=max_nodes,
+                     reservations=reservations, reservation_tick=reservation_tick)
+    try:
+        while True:
+            next(search)
+    except StopIteration as stop:
+        goal_state, best_state, out_of_nodes, expanded, pushed, checks = stop.value
+
+    _record(stats, expanded, pushed, checks)
+    if goal_state is not None:
+        return _build_path(parents, goal_state, occupancy, start_pos) # Retourne le plan complet (col, row, time)
+    if out_of_nodes:
+        return _build_path(parents, best_state, occupancy, start_pos)
+    return None # Aucun chemin trouvé dans l'horizon de temps
+
+
+class AnytimeSearch:
+    """
+    Recherche spatio-temporelle interruptible, avec un budget de temps par
+    appel à run() : A* pondéré relancé avec des epsilon décroissants
+    (epsilons). Chaque passe ne garde que les états qui peuvent battre le
+    meilleur plan déjà trouvé ; la dernière (epsilon = 1) prouve qu'il est
+    optimal. Entre deux appels, la recherche reprend là où elle s'était
+    arrêtée.
+    best() retourne le meilleur plan complet trouvé, sinon le meilleur plan
+    partiel (l'état le plus proche du but), jamais None.
+    Les paramètres sont ceux de spatio_temporal_astar.
+    """
+    EPSILONS = (3, 2, 1.5, 1)
+    CHUNK = 32  # expansions entre deux lectures de l'horloge
+
+    def __init__(self, start_pos, end_pos, world_sprites, max_time=100, occupancy=None, start_time=0,
+                 heuristic=None, stats=None, level=None, reservations=None, reservation_tick=0,
+                 epsilons=EPSILONS):
+        if occupancy is None:
+            occupancy = OccupancyTensor(world_sprites, start_time, level=level)
+        self.start_pos = tuple(start_pos)
+        self.occupancy = occupancy
+        self.start_time = start_time
+        self.max_time = max_time
+        self.heuristic = _heuristic_function(end_pos, heuristic)
+        self.stats = stats
+        self.reservations = reservations
+        self.reservation_tick = reservation_tick
+        self.epsilons = epsilons
+
+        self.plan = None                  # meilleur plan complet
+        self.partial = [self.start_pos + (0,)]  # meilleur plan partiel, tant qu'il n'y a pas de plan complet
+        self.epsilon = None               # epsilon de la passe en cours
+        self.done = False                 # toutes les passes sont terminées
+        self.steps = self._passes()
+
+    def _passes(self):
+        for epsilon in self.epsilons:
+            self.epsilon = epsilon
+            parents = {}
+            bound = len(self.plan) - 1 if self.plan else None
+            search = _search(self.start_pos, self.occupancy, self.start_time, self.max_time,
+                             self.heuristic, parents, epsilon=epsilon, bound=bound,
+                             reservations=self.reservations, reservation_tick=self.reservation_tick,
+                             chunk=self.CHUNK)
+            try:
+                while True:
+                    best_state = next(search)
+                    if self.plan is None:
+                        self.partial = _build_path(parents, best_state, self.occupancy, self.start_pos)
+                    yield
+            except StopIteration as stop:
+                goal_state, best_state, _, expanded, pushed, checks = stop.value
+            _record(self.stats, expanded, pushed, checks)
+
+            if goal_state is not None:
+                self.plan = _build_path(parents, goal_state, self.occupancy, self.start_pos)
+            elif self.plan is None:
+                # Aucun plan complet dans l'horizon, même sans pondération :
+                # les passes suivantes ne feraient pas mieux
+                self.partial = _build_path(parents, best_state, self.occupancy, self.start_pos)
+                break
+
+    def run(self, deadline):
+        """
+        Fait avancer la recherche jusqu'à l'instant deadline (perf_counter())
+        ou jusqu'à la fin des passes, puis retourne best().
+        """
+        while not self.done:
+            try:
+                next(self.steps)
+            except StopIteration:
+                self.done = True
+                break
+            if perf_counter() >= deadline:
+                break
+        return self.best()
+
+    def best(self):
+        return self.plan if self.plan is not None else self.partial
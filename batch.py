@@ -0,0 +1,254 @@
+# batch.py
+#
+# Simulation vectorisée de N parties de Frogger indépendantes en parallèle.
+# Le monde est stocké "en colonnes" (structure of arrays) : positions,
+# vitesses, largeurs et états de plongée de tous les sprites de toutes les
+# parties vivent dans des tableaux NumPy, et step() avance toutes les
+# parties d'un coup. Utile pour évaluer des variantes de planificateurs sur
+# des milliers de rollouts.
+
+import numpy as np
+import pygame
+
+import astar
+import simulation
+
+TILE_SIZE = simulation.TILE_SIZE
+
+# Actions de la grenouille : rester, haut, bas, gauche, droite
+MOVES = np.array([(0, 0), (0, -1), (0, 1), (-1, 0), (1, 0)])
+
+# Causes de mort (tableau death_cause)
+ALIVE, CAR, WATER, OFF_SCREEN, DIVING_TURTLE = 0, 1, 2, 3, 4
+DEATH_CAUSES = {CAR: 'car', WATER: 'water', OFF_SCREEN: 'off-screen', DIVING_TURTLE: 'diving turtle'}
+
+
+def pixel_round(values):
+    """ Arrondi des positions non entières comme pygame.Rect (0.5 -> loin de zéro). """
+    return np.where(values >= 0, np.floor(values + 0.5), np.ceil(values - 0.5))
+
+
+def wrap_rules(sprite_class, screen_width):
+    """
+    Retourne (boucle_par_la_droite, boucle_par_la_gauche) pour une classe
+    de sprite, en sondant son move_rect : on garde ainsi exactement les
+    règles de simulation.py sans les recopier.
+    """
+    rect = pygame.Rect(screen_width + 10, 0, 10, 10)
+    sprite_class.move_rect(rect, 1, screen_width)
+    wraps_right = rect.right == 0
+    rect = pygame.Rect(-30, 0, 10, 10)
+    sprite_class.move_rect(rect, -1, screen_width)
+    wraps_left = rect.left == screen_width
+    return wraps_right, wraps_left
+
+
+class BatchWorld:
+    """
+    N copies du niveau d'un simulation.World, avec une grenouille par copie.
+    Les sprites sont les mêmes dans toutes les parties (vitesses, largeurs,
+    lignes) ; seules les positions et l'état des tortues diffèrent.
+
+    Le pas est exact par rapport à simulation.World (même arrondi et mêmes
+    règles de bouclage) tant qu'une grenouille ne touche pas deux sprites de
+    la même voie pendant le même tick.
+    """
+    def __init__(self, n, world=None, phase_offsets=None):
+        if world is None:
+            world = simulation.World()
+        self.n = n
+        self.level = world.level
+        self.width = world.width
+        self.height = world.height
+
+        sprites = list(world.turtles) + list(world.logs) + list(world.cars)
+        self.speed = np.array([s.speed for s in sprites], dtype=float)
+        self.y = np.array([s.rect.y for s in sprites], dtype=float)
+        self.w = np.array([s.rect.width for s in sprites], dtype=float)
+        self.h = np.array([s.rect.height for s in sprites], dtype=float)
+        self.is_car = np.array([isinstance(s, simulation.Car) for s in sprites])
+        self.can_dive = np.array([getattr(s, 'canDive', 0) == 2 for s in sprites])
+        rules = {cls: wrap_rules(cls, self.width) for cls in {type(s) for s in sprites}}
+        self.wraps_right = np.array([rules[type(s)][0] for s in sprites]) & (self.speed > 0)
+        self.wraps_left = np.array([rules[type(s)][1] for s in sprites]) & (self.speed < 0)
+
+        # Positions (N, S) et état des tortues plongeantes par partie
+        self.x = np.tile(np.array([s.rect.x for s in sprites], dtype=float), (n, 1))
+        divers_state = next((t.state for t in world.turtles if t.canDive == 2), 0)
+        self.dive_state = np.full(n, divers_state, dtype=np.int8)
+        self.turtle_counter = np.full(n, world.turtle_counter, dtype=np.int64)
+        self.tick = 0
+
+        # Décalage de phase : chaque partie peut démarrer à un tick différent
+        if phase_offsets is not None:
+            phase_offsets = np.asarray(phase_offsets)
+            for t in range(int(phase_offsets.max(initial=0))):
+                self._move_sprites(phase_offsets > t)
+
+        # Une grenouille par partie (coin haut-gauche en pixels)
+        frog = simulation.Frog(self.width / 2, self.level.start_row * TILE_SIZE)
+        self.frog_start = (frog.rect.x, frog.rect.y)
+        self.fx = np.full(n, frog.rect.x, dtype=float)
+        self.fy = np.full(n, frog.rect.y, dtype=float)
+        self.dead = np.zeros(n, dtype=bool)
+        self.won = np.zeros(n, dtype=bool)
+        self.death_cause = np.zeros(n, dtype=np.int8)
+        self.done_tick = np.full(n, -1, dtype=np.int64)
+
+    @property
+    def active(self):
+        return ~(self.dead | self.won)
+
+    def _move_sprites(self, mask=None):
+        """
+        Déplace les sprites et fait avancer le cycle de plongée des tortues,
+        pour toutes les parties ou seulement celles de mask.
+        """
+        x = pixel_round(self.x + self.speed)
+        x = np.where(self.wraps_right & (x > self.width), -self.w, x)
+        x = np.where(self.wraps_left & (x + self.w < 0), self.width, x)
+
+        counter = self.turtle_counter + 1
+        flip = counter >= simulation.DIVE_PERIOD
+        if mask is not None:
+            x = np.where(mask[:, None], x, self.x)
+            counter = np.where(mask, counter, self.turtle_counter)
+            flip &= mask
+
+        self.x = x
+        self.turtle_counter = np.where(flip, 0, counter)
+        self.dive_state = np.where(flip, 1 - self.dive_state, self.dive_state).astype(np.int8)
+
+    def step(self, actions=None):
+        """
+        Avance toutes les parties d'un tick. actions : tableau (N,) d'indices
+        dans MOVES (0 = la grenouille ne bouge pas). Les parties terminées
+        (victoire ou mort) ne bougent plus.
+        """
+        active = self.active
+
+        # La grenouille se déplace d'une case (recalée sur la grille)
+        if actions is not None:
+            actions = np.asarray(actions)
+            moving = active & (actions != 0)
+            move = MOVES[actions]
+            self.fx = np.where(moving, (self.fx // TILE_SIZE + move[:, 0]) * TILE_SIZE, self.fx)
+            self.fy = np.where(moving, (self.fy // TILE_SIZE + move[:, 1]) * TILE_SIZE, self.fy)
+
+        # Les collisions utilisent l'état des tortues d'avant le changement de fin de tick
+        diving = self.dive_state[:, None] == 1
+        self._move_sprites()
+
+        # Collisions sprites / grenouille (rectangles pygame : bords exclus)
+        overlap = ((self.x < self.fx[:, None] + TILE_SIZE) & (self.x + self.w > self.fx[:, None])
+                   & (self.y < self.fy[:, None] + TILE_SIZE) & (self.y + self.h > self.fy[:, None])
+                   & active[:, None])
+        hit_car = (overlap & self.is_car).any(axis=1)
+        hit_diver = (overlap & self.can_dive & diving).any(axis=1)
+        self._kill(hit_car, CAR)
+        self._kill(hit_diver & ~hit_car, DIVING_TURTLE)
+
+        # Les surfaces (bûches, tortues) emportent la grenouille
+        carrying = overlap & ~self.is_car & ~(self.can_dive & diving) & ~self.dead[:, None]
+        carried = carrying.any(axis=1)
+        carry_speed = self.speed[carrying.argmax(axis=1)]
+        self.fx = np.where(carried, pixel_round(self.fx + carry_speed), self.fx)
+
+        # Vérification du statut : hors de l'écran, dans l'eau, arrivée
+        active = self.active
+        off_screen = active & ((self.fx + TILE_SIZE < 0) | (self.fx > self.width))
+        self._kill(off_screen, OFF_SCREEN)
+
+        river_rows = self.level.river_rows
+        in_river = (self.active & (self.fy > (river_rows.start - 1) * TILE_SIZE)
+                    & (self.fy <= (river_rows.stop - 1) * TILE_SIZE))
+        on_surface = ((self.x < self.fx[:, None] + TILE_SIZE) & (self.x + self.w > self.fx[:, None])
+                      & (self.y < self.fy[:, None] + TILE_SIZE) & (self.y + self.h > self.fy[:, None])
+                      & ~self.is_car & ~(self.can_dive & diving)).any(axis=1)
+        self._kill(in_river & ~on_surface, WATER)
+
+        reached = self.active & (self.fy <= self.level.goal_row * TILE_SIZE)
+        self.won |= reached
+        self.done_tick = np.where(reached, self.tick + 1, self.done_tick)
+
+        self.tick += 1
+
+    def _kill(self, mask, cause):
+        mask = mask & self.active
+        self.dead |= mask
+        self.death_cause = np.where(mask, cause, self.death_cause).astype(np.int8)
+        self.done_tick = np.where(mask, self.tick + 1, self.done_tick)
+
+    def blocked_cells(self, ticks_ahead=0):
+        """
+        Grilles (N, lignes, colonnes) des cases dangereuses de chaque partie,
+        maintenant ou après ticks_ahead ticks, rastérisées en une seule passe.
+        """
+        grid_width = self.width // TILE_SIZE
+        grid_height = self.height // TILE_SIZE
+
+        x, dive_state = self.x, self.dive_state
+        if ticks_ahead:
+            saved = (self.x, self.dive_state, self.turtle_counter)
+            for _ in range(ticks_ahead):
+                self._move_sprites()
+            x, dive_state = self.x, self.dive_state
+            self.x, self.dive_state, self.turtle_counter = saved
+
+        # Une "ligne" par (partie, ligne de grille) pour remplir tout le lot d'un coup
+        instance = np.repeat(np.arange(self.n), x.shape[1]).reshape(x.shape)
+        rows = instance * grid_height + (self.y // TILE_SIZE)[None, :]
+        safe = ~self.is_car & ~(self.can_dive & (dive_state[:, None] == 1))
+        car = np.broadcast_to(self.is_car, x.shape)
+        right = x + self.w
+
+        safe_cells = astar.fill_intervals(self.n * grid_height, grid_width, rows[safe], x[safe], right[safe])
+        car_cells = astar.fill_intervals(self.n * grid_height, grid_width, rows[car], x[car], right[car])
+
+        river = np.zeros((grid_height, grid_width), dtype=bool)
+        river[self.level.river_rows.start:self.level.river_rows.stop, :] = True
+        blocked = (np.tile(river, (self.n, 1)) & ~safe_cells) | car_cells
+        return blocked.reshape(self.n, grid_height, grid_width)
+
+
+def greedy_policy(batch):
+    """
+    Politique vectorisée simple : la grenouille monte si la case du dessus est
+    sûre maintenant et au tick suivant, sinon essaie gauche/droite, sinon attend.
+    """
+    blocked = batch.blocked_cells(0) | batch.blocked_cells(1)
+    n, grid_height, grid_width = blocked.shape
+    col = (batch.fx // TILE_SIZE).astype(int)
+    row = (batch.fy // TILE_SIZE).astype(int)
+    instances = np.arange(n)
+
+    actions = np.zeros(n, dtype=int)
+    for action in (4, 3, 1):  # la dernière action sûre l'emporte : haut > gauche > droite
+        new_col = col + MOVES[action][0]
+        new_row = row + MOVES[action][1]
+        inside = (new_col >= 0) & (new_col < grid_width) & (new_row >= 0) & (new_row < grid_height)
+        safe = inside.copy()
+        safe[inside] = ~blocked[instances[inside], new_row[inside], new_col[inside]]
+        actions = np.where(safe, action, actions)
+    return actions
+
+
+def rollout(batch, policy, max_ticks=300):
+    """
+    Joue toutes les parties du lot jusqu'à leur fin (ou max_ticks) avec
+    policy(batch) -> actions. Retourne un dict de statistiques agrégées.
+    """
+    for _ in range(max_ticks):
+        if not batch.active.any():
+            break
+        batch.step(policy(batch))
+
+    stats = {
+        'episodes': batch.n,
+        'victories': int(batch.won.sum()),
+        'deaths': {name: int((batch.death_cause == cause).sum()) for cause, name in DEATH_CAUSES.items()},
+        'timeouts': int(batch.active.sum()),
+    }
+    if batch.won.any():
+        stats['mean_ticks_to_goal'] = float(batch.done_tick[batch.won].mean())
+    return stats
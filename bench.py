@@ -0,0 +1,566 @@
+# bench.py
+#
+# Petits benchmarks des planificateurs, sans affichage.
+# Usage : python bench.py [astar] [spatio] [grids] [batch] [dstar] [heuristic] [scale] [swarm] [anytime] [sipp]
+
+import random
+import sys
+import time
+import timeit
+
+import numpy as np
+import pygame
+
+import astar
+import astar_spatiotemporal as astar_st
+import batch
+import dstar_lite
+import lanes
+import level
+import simulation
+from agents import ReactiveAgent, SpatioTemporalAgent
+
+
+def time_call(func, repeat=5, number=None):
+    """
+    Chronomètre func() et retourne le meilleur temps par appel, en secondes.
+    Si number n'est pas donné, on l'ajuste pour que chaque mesure dure ~0.2 s.
+    """
+    timer = timeit.Timer(func)
+    if number is None:
+        number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def synthetic_grid(width, height, density, seed=0):
+    """ Grille aléatoire (0 = praticable, 1 = obstacle) avec départ et arrivée libres. """
+    rng = random.Random(seed)
+    grid = [[1 if rng.random() < density else 0 for _ in range(width)] for _ in range(height)]
+    grid[height - 1][width // 2] = 0
+    grid[0][width // 2] = 0
+    return grid
+
+
+def bench_astar():
+    print("=== astar.astar ===")
+
+    # Plateau du jeu (14x16) : la grille conservative_grid après quelques ticks
+    world = simulation.World()
+    for _ in range(10):
+        world.step()
+    grid = astar.conservative_grid(world.width, world.height, world.cars, world.logs,
+                                   world.turtles, world.turtle_counter)
+    start, end = (6, 14), (7, 2)
+    path = astar.astar(grid, start, end)
+    seconds = time_call(lambda: astar.astar(grid, start, end))
+    print(f"plateau {len(grid[0])}x{len(grid)} : {seconds * 1e6:10.1f} µs/replan "
+          f"(chemin de {len(path) - 1 if path else '-'} pas)")
+
+    # Grilles synthétiques plus grandes, du bas au haut de la grille
+    for size in (50, 200, 500):
+        grid = synthetic_grid(size, size, 0.25, seed=size)
+        start, end = (size // 2, size - 1), (size // 2, 0)
+        path = astar.astar(grid, start, end)
+        seconds = time_call(lambda: astar.astar(grid, start, end), repeat=3)
+        print(f"synthétique {size}x{size} : {seconds * 1e3:10.2f} ms/replan "
+              f"(chemin de {len(path) - 1 if path else '-'} pas)")
+
+
+def bench_spatio_temporal_astar():
+    print("=== astar_spatiotemporal.spatio_temporal_astar ===")
+
+    world = simulation.World()
+    for _ in range(10):
+        world.step()
+    world_sprites = world.world_sprites()
+    start, end = (6, 14), (7, 2)
+
+    for max_time in (25, 100, 400):
+        plan = astar_st.spatio_temporal_astar(start, end, world_sprites, max_time=max_time)
+        seconds = time_call(lambda: astar_st.spatio_temporal_astar(start, end, world_sprites, max_time=max_time),
+                            repeat=3)
+        print(f"max_time={max_time:4d} : {seconds * 1e3:10.2f} ms/plan "
+              f"(plan de {len(plan) - 1 if plan else '-'} pas)")
+
+    # Pire cas : but hors de la grille, tout l'horizon est exploré
+    for max_time in (25, 100):
+        seconds = time_call(lambda: astar_st.spatio_temporal_astar(start, (7, -1), world_sprites, max_time=max_time),
+                            repeat=1, number=1)
+        print(f"max_time={max_time:4d} : {seconds * 1e3:10.2f} ms/plan (but inatteignable)")
+
+    # Tableau d'occupation déjà calculé et réutilisé d'un plan à l'autre
+    occupancy = astar_st.OccupancyTensor(world_sprites, 100)
+    seconds = time_call(lambda: astar_st.spatio_temporal_astar(start, (7, -1), world_sprites, max_time=100,
+                                                               occupancy=occupancy),
+                        repeat=1, number=1)
+    print(f"max_time= 100 : {seconds * 1e3:10.2f} ms/plan (but inatteignable, tableau réutilisé)")
+
+    # Budget de nœuds : plan partiel
+    for max_nodes in (50, 500):
+        plan = astar_st.spatio_temporal_astar(start, end, world_sprites, max_nodes=max_nodes)
+        seconds = time_call(lambda: astar_st.spatio_temporal_astar(start, end, world_sprites, max_nodes=max_nodes),
+                            repeat=3)
+        print(f"max_nodes={max_nodes:4d} : {seconds * 1e3:10.2f} ms/plan "
+              f"(fin du plan en {plan[-1] if plan else '-'})")
+
+
+# === Implémentations d'origine des grilles (listes de listes), gardées comme référence ===
+
+def legacy_create_grid(screen_width, screen_height, cars, logs, turtles):
+    """
+    Crée une grille 2D représentant l'état actuel du jeu.
+    0 = praticable, 1 = obstacle.
+    """
+    grid_width = screen_width // astar.TILE_SIZE
+    grid_height = screen_height // astar.TILE_SIZE
+    grid = [[0 for _ in range(grid_width)] for _ in range(grid_height)]
+
+    # Marque la rivière comme obstacles (lignes 3 à 7)
+    for row in range(3, 8):
+        if 0 <= row < grid_height:
+            for col in range(grid_width):
+                grid[row][col] = 1
+
+    # Surfaces sûres (bûches & tortues non plongeantes)
+    safe_surfaces = pygame.sprite.Group(logs, turtles)
+    for sprite in safe_surfaces:
+        # Tortues plongeantes non sûres
+        if hasattr(sprite, 'state') and sprite.state == 1:
+            continue
+
+        row = sprite.rect.top // astar.TILE_SIZE
+        if not (0 <= row < grid_height):
+            continue
+
+        start_col = sprite.rect.left // astar.TILE_SIZE
+        end_col = (sprite.rect.right - 1) // astar.TILE_SIZE  
+
+
+        start_col = max(0, start_col)
+        end_col = min(grid_width - 1, end_col)
+
+        for col in range(start_col, end_col + 1):
+            grid[row][col] = 0
+
+    # Traitement des voitures
+    for car in cars:
+        row = car.rect.top // astar.TILE_SIZE
+        if not (0 <= row < grid_height):
+            continue
+
+        start_col = car.rect.left // astar.TILE_SIZE
+        end_col = (car.rect.right - 1) // astar.TILE_SIZE
+
+        start_col = max(0, start_col)
+        end_col = min(grid_width - 1, end_col)
+
+        for col in range(start_col, end_col + 1):
+            grid[row][col] = 1
+
+    return grid
+
+
+
+
+# Cette version de create_grid prédit la position des objets à la prochaine frame t+1
+# Elle est utile pour éviter que la grenouille ne meure à cause d'un obstacle qui
+# n'est pas encore là dans la frame actuelle t.
+def legacy_create_predictive_grid(screen_width, screen_height, cars, logs, turtles, turtle_counter):
+    """
+    Grille 2D représentant l'état du jeu à la PROCHAINE frame (t+1).
+    0 = praticable, 1 = obstacle.
+    """
+    grid_width = screen_width // astar.TILE_SIZE
+    grid_height = screen_height // astar.TILE_SIZE
+    grid = [[0 for _ in range(grid_width)] for _ in range(grid_height)]
+
+    # Marque la rivière comme obstacles 
+    for row in range(3, 8):
+        if 0 <= row < grid_height:
+            for col in range(grid_width):
+                grid[row][col] = 1
+
+    # Surfaces sûres prédites (bûches & tortues non plongeantes à t+1)
+    safe_surfaces = pygame.sprite.Group(logs, turtles)
+    for sprite in safe_surfaces:
+        # on prédit le plongeon des tortues
+        will_dive = False
+        if hasattr(sprite, 'canDive') and sprite.canDive == 2:
+            if (turtle_counter + 1) % 50 == 0:
+                will_dive = (sprite.state == 0)  # va commencer à plonger
+            else:
+                will_dive = (sprite.state == 1)  # reste en plongée
+
+        if will_dive:
+            continue
+
+        # Position future à t+1
+        future_left = sprite.rect.left + sprite.speed
+        future_right = sprite.rect.right + sprite.speed
+        row = sprite.rect.top // astar.TILE_SIZE
+        if not (0 <= row < grid_height):
+            continue
+
+        start_col = int(future_left // astar.TILE_SIZE)
+        end_col = int((future_right - 1) // astar.TILE_SIZE)  
+
+
+        start_col = max(0, start_col)
+        end_col = min(grid_width - 1, end_col)
+
+        for col in range(start_col, end_col + 1):
+            grid[row][col] = 0
+
+    # Voitures prédites à t+1
+    for car in cars:
+        future_left = car.rect.left + car.speed
+        future_right = car.rect.right + car.speed
+        row = car.rect.top // astar.TILE_SIZE
+        if not (0 <= row < grid_height):
+            continue
+
+        start_col = int(future_left // astar.TILE_SIZE)
+        end_col = int((future_right - 1) // astar.TILE_SIZE)
+
+        start_col = max(0, start_col)
+        end_col = min(grid_width - 1, end_col)
+
+        for col in range(start_col, end_col + 1):
+            grid[row][col] = 1
+
+    return grid
+
+
+# version "plus intelligente" de create_grid qui combine les deux fonctions précédentes.
+def legacy_conservative_grid(screen_width, screen_height, cars, logs, turtles, turtle_counter):
+    g_now  = legacy_create_grid(screen_width, screen_height, cars, logs, turtles)
+    g_next = legacy_create_predictive_grid(screen_width, screen_height, cars, logs, turtles, turtle_counter)
+    h, w = len(g_now), len(g_now[0])
+    grid = [[0]*w for _ in range(h)]
+    for r in range(h):
+        for c in range(w):
+            # on check s'il y a obstacle maintenant OU à la prochaine frame.
+            grid[r][c] = 1 if (g_now[r][c] == 1 or g_next[r][c] == 1) else 0
+    return grid
+
+
+def synthetic_level(grid_width, grid_height, seed=0):
+    """
+    Un grand plateau aléatoire : une voie de voitures ou de bûches par ligne,
+    avec 1 sprite pour 4 cases en moyenne.
+    """
+    rng = random.Random(seed)
+    cars, logs, turtles = pygame.sprite.Group(), pygame.sprite.Group(), pygame.sprite.Group()
+    for row in range(grid_height):
+        speed = rng.choice([-4, -3, -2, 2, 3, 4])
+        for _ in range(grid_width // 4):
+            x = rng.randrange(grid_width * astar.TILE_SIZE)
+            if 3 <= row < 8 or rng.random() < 0.5:
+                logs.add(simulation.Log(x, row * astar.TILE_SIZE, 'long', 75, 25, speed))
+            else:
+                cars.add(simulation.Car(x, row * astar.TILE_SIZE, 'yellow', speed, 1, 25, 25))
+    return cars, logs, turtles
+
+
+def bench_grids():
+    print("=== grilles : liste de listes d'origine vs NumPy ===")
+
+    world = simulation.World()
+    for _ in range(10):
+        world.step()
+    boards = [('plateau 14x16', world.width, world.height, world.cars, world.logs, world.turtles)]
+    for size in (100, 400):
+        boards.append((f'synthétique {size}x{size}', size * astar.TILE_SIZE, size * astar.TILE_SIZE)
+                      + synthetic_level(size, size, seed=size))
+
+    for name, width, height, cars, logs, turtles in boards:
+        cases = [
+            ('create_grid', lambda: legacy_create_grid(width, height, cars, logs, turtles),
+             lambda: astar.create_grid_array(width, height, cars, logs, turtles)),
+            ('create_predictive_grid', lambda: legacy_create_predictive_grid(width, height, cars, logs, turtles, 0),
+             lambda: astar.create_predictive_grid_array(width, height, cars, logs, turtles, 0)),
+            ('conservative_grid', lambda: legacy_conservative_grid(width, height, cars, logs, turtles, 0),
+             lambda: astar.conservative_grid_array(width, height, cars, logs, turtles, 0)),
+        ]
+        for func_name, legacy_func, array_func in cases:
+            legacy_seconds = time_call(legacy_func, repeat=3)
+            array_seconds = time_call(array_func, repeat=3)
+            print(f"{name:18s} {func_name:24s} : {legacy_seconds * 1e3:9.3f} ms -> "
+                  f"{array_seconds * 1e3:9.3f} ms (x{legacy_seconds / array_seconds:.1f})")
+
+    # Grille construite à partir du cache des voies (lanes.py)
+    world_sprites = world.world_sprites()
+    seconds = time_call(lambda: lanes.WorldTimeline(world_sprites).conservative_grid())
+    print(f"{'plateau 14x16':18s} {'WorldTimeline':24s} : {seconds * 1e3:9.3f} ms")
+
+
+def bench_batch():
+    print("=== batch.BatchWorld : N parties en parallèle ===")
+
+    for n in (1000, 10000):
+        world = batch.BatchWorld(n)
+        sprite_count = world.x.shape[1]
+        seconds = time_call(world.step, repeat=3)
+        print(f"N={n:6d} step()           : {seconds * 1e3:8.2f} ms/tick "
+              f"({n * sprite_count / seconds / 1e6:6.1f} M sprites/s)")
+
+        # Rollout complet avec la politique gloutonne vectorisée, phases aléatoires
+        if n > 1000:
+            continue
+        offsets = np.random.default_rng(n).integers(0, 500, n)
+        world = batch.BatchWorld(n, phase_offsets=offsets)
+        start = time.perf_counter()
+        stats = batch.rollout(world, batch.greedy_policy, max_ticks=300)
+        seconds = time.perf_counter() - start
+        print(f"N={n:6d} rollout glouton  : {seconds:8.2f} s "
+              f"({n * sprite_count * world.tick / seconds / 1e6:6.1f} M sprites/s, "
+              f"{stats['victories']} victoires)")
+
+
+def bench_dstar():
+    print("=== D* Lite : réparation incrémentale vs A* complet ===")
+
+    for size, flips in ((50, 5), (200, 5), (200, 50), (500, 5)):
+        rng = random.Random(size + flips)
+        grid = synthetic_grid(size, size, 0.1, seed=size)
+        start, goal = (size // 2, size - 1), (size // 2, 0)
+        planner = dstar_lite.DStarLite(grid, start, goal)
+
+        frames = 20
+        astar_seconds = dstar_seconds = 0.0
+        expanded = planner.expanded
+        for _ in range(frames):
+            # Quelques cases changent entre deux frames (hors départ et but)
+            new_grid = [row[:] for row in grid]
+            for _ in range(flips):
+                col, row = rng.randrange(size), rng.randrange(1, size - 1)
+                new_grid[row][col] = 1 - new_grid[row][col]
+            changed = dstar_lite.changed_cells(grid, new_grid)
+            grid = new_grid
+
+            begin = time.perf_counter()
+            astar.astar(grid, start, goal)
+            astar_seconds += time.perf_counter() - begin
+
+            begin = time.perf_counter()
+            planner.update(grid, changed, start)
+            planner.path()
+            dstar_seconds += time.perf_counter() - begin
+
+        print(f"{size}x{size}, {flips:2d} cases/frame : A* {astar_seconds / frames * 1e3:8.2f} ms, "
+              f"D* Lite {dstar_seconds / frames * 1e3:8.2f} ms "
+              f"({(planner.expanded - expanded) / frames:.0f} expansions/frame)")
+
+
+def walled_grid(size, seed=0):
+    """ Grille synthétique avec un mur horizontal toutes les 10 lignes, percé d'une seule ouverture. """
+    rng = random.Random(seed)
+    grid = synthetic_grid(size, size, 0.05, seed=seed)
+    for row in range(5, size - 1, 10):
+        gap = rng.randrange(size)
+        grid[row] = [1] * size
+        for r in (row - 1, row, row + 1):
+            grid[r][gap] = 0
+    return grid
+
+
+def bench_heuristic():
+    print("=== Tables d'heuristique (distance_table) vs Manhattan ===")
+
+    # Grilles à murs fixes : la carte du niveau est la grille elle-même
+    for size in (50, 200):
+        grid = walled_grid(size, seed=size)
+        start, end = (size // 2, size - 1), (size // 2, 0)
+        table = astar.distance_table(astar.grid_passable_masks(grid), size, astar.goal_set(end))
+        for name, heuristic in (('Manhattan', None), ('table', table)):
+            stats = {}
+            path = astar.astar(grid, start, end, heuristic=heuristic, stats=stats)
+            seconds = time_call(lambda: astar.astar(grid, start, end, heuristic=heuristic), repeat=3)
+            print(f"murs {size}x{size}, {name:9s} : {seconds * 1e3:8.2f} ms/replan, "
+                  f"{stats['expanded']:6d} nœuds développés (chemin de {len(path) - 1 if path else '-'} pas)")
+
+    # Plateau du jeu : plans spatio-temporels depuis plusieurs instants
+    world = simulation.World()
+    goals = [(x, 2) for x in range(1, 13, 2)]
+    totals = {'Manhattan': {}, 'table': {}}
+    for _ in range(20):
+        for _ in range(37):
+            world.step()
+        occupancy = astar_st.OccupancyTensor(world.world_sprites(), 0, exact=True)
+        table = astar.distance_table(occupancy.timeline.passable_masks(), occupancy.grid_width,
+                                     astar.goal_set(goals))
+        for name, heuristic in (('Manhattan', None), ('table', table)):
+            astar_st.spatio_temporal_astar((6, 14), goals, None, occupancy=occupancy,
+                                           heuristic=heuristic, stats=totals[name])
+    for name, stats in totals.items():
+        print(f"plateau, spatio-temporel, {name:9s} : {stats['expanded'] / 20:8.1f} nœuds développés/plan")
+
+
+def bench_scale():
+    print("=== passage à l'échelle : plateaux aléatoires (level.random_level) ===")
+
+    boards = [('origine 14x16', level.DEFAULT_LEVEL)]
+    for width, height in ((50, 50), (100, 100), (20, 1000)):
+        boards.append((f'aléatoire {width}x{height}', level.random_level(width, height, seed=width)))
+
+    for name, board in boards:
+        world = simulation.World(board)
+        for _ in range(37):
+            world.step()
+        world_sprites = world.world_sprites()
+        start = (world.width // 2 // astar.TILE_SIZE, board.start_row)
+        goals = board.goal_positions()
+
+        lanes.default_cache.clear()
+        begin = time.perf_counter()
+        timeline = lanes.WorldTimeline(world_sprites, board)
+        first_seconds = time.perf_counter() - begin
+        timeline_seconds = time_call(lambda: lanes.WorldTimeline(world_sprites, board), repeat=3)
+        grid_seconds = time_call(lambda: timeline.conservative_grid(), repeat=3)
+
+        grid = timeline.conservative_grid()
+        path = astar.astar(grid, start, goals)
+        astar_seconds = time_call(lambda: astar.astar(grid, start, goals), repeat=3)
+
+        # Budget de nœuds : sur les plus grands plateaux, le plan est partiel
+        max_time = 3 * board.grid_height
+        stats = {}
+        begin = time.perf_counter()
+        occupancy = astar_st.OccupancyTensor(world_sprites, 0, exact=True, level=board)
+        plan = astar_st.spatio_temporal_astar(start, goals, world_sprites, max_time=max_time, max_nodes=100000,
+                                              occupancy=occupancy, stats=stats)
+        spatio_seconds = time.perf_counter() - begin
+
+        print(f"{name:22s} : {len(board.lanes):4d} voies, cycles {first_seconds * 1e3:8.1f} ms, "
+              f"WorldTimeline {timeline_seconds * 1e3:7.2f} ms, grille {grid_seconds * 1e3:7.2f} ms, "
+              f"A* {astar_seconds * 1e3:7.2f} ms ({len(path) - 1 if path else '-'} pas), "
+              f"spatio {spatio_seconds * 1e3:8.1f} ms ({len(plan) - 1 if plan else '-'} pas "
+              f"jusqu'à la ligne {plan[-1][1] if plan else '-'}, {stats['expanded']} nœuds)")
+
+
+def bench_anytime(plans=20):
+    print("=== recherche anytime (AnytimeSearch) : budget par tick vs qualité du plan ===")
+
+    world = simulation.World()
+    goals = world.level.goal_positions()
+    problems = []
+    for _ in range(plans):
+        for _ in range(37):
+            world.step()
+        occupancy = astar_st.OccupancyTensor(world.world_sprites(), 0, exact=True)
+        optimal = astar_st.spatio_temporal_astar((6, 14), goals, None, occupancy=occupancy)
+        problems.append((occupancy, len(optimal) - 1 if optimal else None))
+
+    for budget_ms in (0.1, 0.5, 2, 10):
+        first_costs, calls, worst = [], [], 0
+        for occupancy, optimal in problems:
+            search = astar_st.AnytimeSearch((6, 14), goals, None, occupancy=occupancy)
+            n = 0
+            while not search.done:
+                begin = time.perf_counter()
+                plan = search.run(begin + budget_ms / 1000)
+                worst = max(worst, time.perf_counter() - begin)
+                if n == 0:
+                    # Écart au plan optimal du premier plan (partiel : pas encore complet)
+                    first_costs.append(len(plan) - 1 - optimal if search.plan is not None else None)
+                n += 1
+            calls.append(n)
+        complete = [c for c in first_costs if c is not None]
+        print(f"budget {budget_ms:5.1f} ms : 1er plan complet {len(complete):2d}/{plans} "
+              f"(écart moyen {np.mean(complete) if complete else 0:.1f} pas), "
+              f"optimal prouvé après {np.mean(calls):5.1f} ticks, appel le plus long {worst * 1e3:6.2f} ms")
+
+
+def bench_sipp(plans=10):
+    print("=== SIPP (intervalles sûrs) vs recherche tick par tick ===")
+
+    boards = [('origine 14x16', level.DEFAULT_LEVEL, (100, 1000)),
+              ('aléatoire 40x40', level.random_level(40, 40, seed=4), (300, 1000)),
+              ('aléatoire 20x150', level.random_level(20, 150, seed=20), (1000, 3000))]
+    for name, board, horizons in boards:
+        world = simulation.World(board)
+        goals = board.goal_positions()
+        start = (board.grid_width // 2, board.start_row)
+        problems = []
+        for _ in range(plans):
+            for _ in range(37):
+                world.step()
+            problems.append(lanes.WorldTimeline(world.world_sprites(), board))
+
+        for max_time in horizons:
+            results = {}
+            for sipp in (False, True):
+                stats, lengths = {}, []
+                begin = time.perf_counter()
+                for timeline in problems:
+                    # Tableau neuf à chaque plan : la construction des couches
+                    # ou des intervalles est comptée
+                    occupancy = astar_st.OccupancyTensor(timeline, 0, exact=True)
+                    plan = astar_st.spatio_temporal_astar(start, goals, None, max_time=max_time,
+                                                          occupancy=occupancy, stats=stats, sipp=sipp)
+                    lengths.append(len(plan) - 1 if plan else None)
+                results[sipp] = (lengths, stats['expanded'], (time.perf_counter() - begin) / plans)
+            (tick_lengths, tick_expanded, tick_seconds), (sipp_lengths, sipp_expanded, sipp_seconds) = \
+                results[False], results[True]
+            found = sum(1 for n in sipp_lengths if n is not None)
+            print(f"{name:17s} horizon {max_time:5d} : tick {tick_expanded // plans:7d} nœuds "
+                  f"{tick_seconds * 1e3:8.1f} ms, SIPP {sipp_expanded // plans:6d} nœuds "
+                  f"{sipp_seconds * 1e3:7.1f} ms par plan ; {found}/{plans} plans, "
+                  f"mêmes arrivées : {'oui' if tick_lengths == sipp_lengths else 'NON'}")
+
+
+class PerFrog:
+    """ Cache act_all d'un agent : run_swarm planifie alors grenouille par grenouille. """
+    def __init__(self, agent):
+        self.agent = agent
+
+    def act(self, world, frog):
+        self.agent.act(world, frog)
+
+
+def bench_swarm(ticks=50):
+    print("=== essaim : N grenouilles dans un même monde, planification groupée (act_all) ===")
+
+    agents = {
+        'reactive': ReactiveAgent,
+        'dstar': lambda: ReactiveAgent(incremental=True),
+        'spatio': SpatioTemporalAgent,
+        'coop': lambda: SpatioTemporalAgent(cooperative=True),
+    }
+    # Les cycles de voies du plateau sont calculés une fois, hors mesure
+    lanes.WorldTimeline(simulation.World().world_sprites())
+    for name, make_agent in agents.items():
+        for n_frogs in (1, 10, 100, 500):
+            results = {}
+            # Sans act_all, les grenouilles coopératives ne réservent rien
+            modes = ('groupé',) if name == 'coop' else ('par grenouille', 'groupé')
+            for mode in modes:
+                agent = make_agent() if mode == 'groupé' else PerFrog(make_agent())
+                results[mode] = simulation.run_swarm(agent, n_frogs, ticks=ticks, seed=n_frogs)
+            batched = results['groupé']
+            alone = results.get('par grenouille')
+            speedup = f"x{batched['frogs_per_s'] / alone['frogs_per_s']:.1f}, " if alone else ''
+            alone = f"{alone['frogs_per_s']:9.0f}" if alone else f"{'-':>9s}"
+            print(f"{name:8s} {n_frogs:4d} grenouilles : par grenouille {alone} grenouilles/s, "
+                  f"groupé {batched['frogs_per_s']:9.0f} grenouilles/s "
+                  f"({speedup}{batched['victories']} victoires, {sum(batched['deaths'].values())} morts)")
+
+
+BENCHMARKS = {
+    'astar': bench_astar,
+    'spatio': bench_spatio_temporal_astar,
+    'grids': bench_grids,
+    'batch': bench_batch,
+    'dstar': bench_dstar,
+    'heuristic': bench_heuristic,
+    'scale': bench_scale,
+    'swarm': bench_swarm,
+    'anytime': bench_anytime,
+    'sipp': bench_sipp,
+}
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
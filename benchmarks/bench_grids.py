@@ -0,0 +1,21 @@
+# Construction des grilles d'obstacles (astar.py) sur plusieurs tailles de plateau.
+
+import astar
+
+
+def bench_create_grid(benchmark, board):
+    width, height, cars, logs, turtles = board
+    grid = benchmark(astar.create_grid, width, height, cars, logs, turtles)
+    assert len(grid) == height // astar.TILE_SIZE
+
+
+def bench_create_predictive_grid(benchmark, board):
+    width, height, cars, logs, turtles = board
+    grid = benchmark(astar.create_predictive_grid, width, height, cars, logs, turtles, 0)
+    assert len(grid) == height // astar.TILE_SIZE
+
+
+def bench_conservative_grid(benchmark, board):
+    width, height, cars, logs, turtles = board
+    grid = benchmark(astar.conservative_grid, width, height, cars, logs, turtles, 0)
+    assert len(grid) == height // astar.TILE_SIZE
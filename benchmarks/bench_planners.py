@@ -0,0 +1,72 @@
+# Planificateurs : A* sur grille, is_walkable_at_time et A* spatio-temporel.
+
+import random
+
+import pytest
+
+import astar
+import astar_spatiotemporal as astar_st
+from conftest import GOALS, START
+
+
+def bench_astar(benchmark, board):
+    width, height, cars, logs, turtles = board
+    grid = astar.conservative_grid(width, height, cars, logs, turtles, 0)
+    grid_width, grid_height = len(grid[0]), len(grid)
+    # Du bas au haut du plateau, départ et arrivée forcés praticables
+    start, end = (grid_width // 2, grid_height - 2), (grid_width // 2, 1)
+    grid[start[1]][start[0]] = grid[end[1]][end[0]] = 0
+    benchmark(astar.astar, grid, start, end)
+
+
+def bench_astar_all_goals(benchmark, world):
+    grid = astar.conservative_grid(world.width, world.height, world.cars, world.logs,
+                                   world.turtles, world.turtle_counter)
+    benchmark(astar.astar, grid, START, GOALS)
+
+
+def bench_astar_goal_set(benchmark, world):
+    # Les mêmes buts passés comme un ensemble
+    grid = astar.conservative_grid(world.width, world.height, world.cars, world.logs,
+                                   world.turtles, world.turtle_counter)
+    benchmark(astar.astar, grid, START, frozenset(GOALS))
+
+
+def bench_is_walkable_at_time(benchmark, world):
+    # 100 requêtes (case, temps) tirées au hasard avec une graine fixe
+    rng = random.Random(0)
+    queries = [((rng.randrange(14), rng.randrange(16)), rng.randrange(100)) for _ in range(100)]
+    world_sprites = world.world_sprites()
+
+    def run():
+        return [astar_st.is_walkable_at_time(cell, time, world_sprites) for cell, time in queries]
+
+    benchmark(run)
+
+
+def bench_is_walkable_at_time_lane_index(benchmark, world):
+    # Mêmes requêtes, en ne lisant que les voies de la ligne demandée
+    rng = random.Random(0)
+    queries = [((rng.randrange(14), rng.randrange(16)), rng.randrange(100)) for _ in range(100)]
+    world_sprites = world.world_sprites()
+
+    def run():
+        return [astar_st.is_walkable_at_time(cell, time, world_sprites, lane_index=world.lane_index)
+                for cell, time in queries]
+
+    benchmark(run)
+
+
+@pytest.mark.parametrize('max_time', [25, 100, 400])
+def bench_spatio_temporal_astar(benchmark, world, max_time):
+    world_sprites = world.world_sprites()
+    benchmark(astar_st.spatio_temporal_astar, START, GOALS, world_sprites, max_time=max_time)
+
+
+@pytest.mark.parametrize('max_time', [25, 100])
+def bench_spatio_temporal_astar_unreachable(benchmark, world, max_time):
+    # Pire cas : but hors de la grille, tout l'horizon est exploré
+    world_sprites = world.world_sprites()
+    plan = benchmark.pedantic(astar_st.spatio_temporal_astar, args=(START, (7, -1), world_sprites),
+                              kwargs={'max_time': max_time}, rounds=3)
+    assert plan is None
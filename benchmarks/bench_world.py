@@ -0,0 +1,16 @@
+# Avancement du monde : simulation.World et batch.BatchWorld.
+
+import pytest
+
+import batch
+
+
+def bench_world_step(benchmark, world):
+    world.add_frog()
+    benchmark(world.step)
+
+
+@pytest.mark.parametrize('n', [100, 10000])
+def bench_batch_world_step(benchmark, n):
+    world = batch.BatchWorld(n)
+    benchmark(world.step)
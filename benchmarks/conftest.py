@@ -0,0 +1,45 @@
+# Fixtures partagées des benchmarks : des instantanés du monde reproductibles,
+# construits à partir du niveau de World.set_level (ou d'un grand plateau
+# synthétique) et avancés d'un nombre de ticks tiré d'une graine fixe.
+
+import random
+
+import pytest
+
+import astar
+import simulation
+from bench import synthetic_level
+
+SEEDS = [0, 1, 2]
+MAX_WARMUP_TICKS = 1000
+
+# Départ de la grenouille et nénuphars du vrai plateau, en cases
+START = (6, 14)
+GOALS = [(x, 2) for x in range(1, 13, 2)]
+
+
+def world_snapshot(seed):
+    """ Le niveau de set_level, avancé d'un nombre de ticks déterminé par seed. """
+    world = simulation.World()
+    for _ in range(random.Random(seed).randrange(MAX_WARMUP_TICKS)):
+        world.step()
+    return world
+
+
+@pytest.fixture(params=SEEDS, ids=lambda seed: f"seed{seed}")
+def world(request):
+    return world_snapshot(request.param)
+
+
+@pytest.fixture(params=[None, 50, 200], ids=lambda size: f"{size}x{size}" if size else "plateau")
+def board(request):
+    """
+    (screen_width, screen_height, cars, logs, turtles) : le vrai plateau
+    (14x16 cases) ou un plateau synthétique carré plus grand.
+    """
+    size = request.param
+    if size is None:
+        world = world_snapshot(SEEDS[0])
+        return world.width, world.height, world.cars, world.logs, world.turtles
+    cars, logs, turtles = synthetic_level(size, size, seed=size)
+    return (size * astar.TILE_SIZE, size * astar.TILE_SIZE, cars, logs, turtles)
@@ -0,0 +1,167 @@
+# dstar_lite.py
+#
+# Replanification incrémentale (D* Lite, Koenig & Likhachev) pour la version
+# réactive du jeu. La recherche part du but vers la grenouille et garde ses
+# valeurs g/rhs d'une frame à l'autre : quand seules quelques cases de la
+# grille changent, on ne répare que la partie du chemin concernée.
+
+import heapq
+import itertools
+
+import instrument
+from astar import goal_set
+
+INF = float('inf')
+
+MOVES = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+
+def changed_cells(old_grid, new_grid):
+    """ Liste des cases (col, row) dont la valeur diffère entre deux grilles. """
+    cells = []
+    for row, (old_row, new_row) in enumerate(zip(old_grid, new_grid)):
+        if old_row != new_row:
+            cells.extend((col, row) for col, (a, b) in enumerate(zip(old_row, new_row)) if a != b)
+    return cells
+
+
+class DStarLite:
+    """
+    Planificateur incrémental sur une grille (0 = praticable, 1 = obstacle),
+    avec des positions (col, row) comme astar.astar. goal est un but ou une
+    collection de buts, comme pour astar.astar.
+    Usage : planner = DStarLite(grid, start, goal), puis à chaque frame
+    planner.update(new_grid, changed, new_start) et planner.path().
+    """
+    def __init__(self, grid, start, goal):
+        self.grid = grid
+        self.grid_height = len(grid)
+        self.grid_width = len(grid[0])
+        self.start = start
+        self.goals = goal_set(goal)
+        self.last_start = start
+        self.km = 0  # Décalage des clés quand la grenouille se déplace
+
+        self.g = {}
+        self.rhs = {goal: 0 for goal in self.goals}
+        self.open_heap = []
+        self.open_keys = {}  # état -> clé actuelle dans le tas (suppression paresseuse)
+        self.counter = itertools.count()
+        self.expanded = 0     # Nombre d'expansions depuis la création
+
+        for goal in self.goals:
+            self._push(goal)
+        self.compute_shortest_path()
+
+    def heuristic(self, a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    def _key(self, s):
+        best = min(self.g.get(s, INF), self.rhs.get(s, INF))
+        return (best + self.heuristic(self.start, s) + self.km, best)
+
+    def _push(self, s):
+        key = self._key(s)
+        self.open_keys[s] = key
+        heapq.heappush(self.open_heap, (key, next(self.counter), s))
+
+    def _top(self):
+        """ Retourne (clé, état) du sommet du tas, en sautant les entrées périmées. """
+        while self.open_heap:
+            key, _, s = self.open_heap[0]
+            if self.open_keys.get(s) == key:
+                return key, s
+            heapq.heappop(self.open_heap)
+        return (INF, INF), None
+
+    def _free(self, cell):
+        col, row = cell
+        return 0 <= col < self.grid_width and 0 <= row < self.grid_height and self.grid[row][col] == 0
+
+    def _neighbors(self, s):
+        return [(s[0] + dc, s[1] + dr) for dc, dr in MOVES]
+
+    def _update_vertex(self, u):
+        if u not in self.goals:
+            # Le coût d'un pas vers s' vaut 1 si s' est praticable
+            best = INF
+            for s in self._neighbors(u):
+                if self._free(s):
+                    best = min(best, 1 + self.g.get(s, INF))
+            self.rhs[u] = best
+
+        self.open_keys.pop(u, None)
+        if self.g.get(u, INF) != self.rhs.get(u, INF):
+            self._push(u)
+
+    def compute_shortest_path(self):
+        expanded = self.expanded
+        self._compute_shortest_path()
+        instrument.count('dstar.expanded', self.expanded - expanded)
+
+    def _compute_shortest_path(self):
+        while True:
+            top_key, u = self._top()
+            start_g = self.g.get(self.start, INF)
+            start_rhs = self.rhs.get(self.start, INF)
+            if not (top_key < self._key(self.start) or start_rhs != start_g):
+                break
+            if u is None:
+                break
+
+            heapq.heappop(self.open_heap)
+            del self.open_keys[u]
+            self.expanded += 1
+
+            new_key = self._key(u)
+            if top_key < new_key:
+                self._push(u)
+            elif self.g.get(u, INF) > self.rhs.get(u, INF):
+                self.g[u] = self.rhs[u]
+                for s in self._neighbors(u):
+                    self._update_vertex(s)
+            else:
+                self.g[u] = INF
+                self._update_vertex(u)
+                for s in self._neighbors(u):
+                    self._update_vertex(s)
+
+    def update(self, grid, changed, start):
+        """
+        Prend en compte la nouvelle grille, la liste des cases qui ont changé
+        (voir changed_cells) et la nouvelle position de départ, puis répare
+        le chemin. Le coût suit le nombre de cases touchées, pas la taille
+        de la grille.
+        """
+        self.grid = grid
+        if start != self.start:
+            self.km += self.heuristic(self.last_start, start)
+            self.last_start = start
+            self.start = start
+
+        # Un changement de la case v modifie le coût des pas vers v depuis ses voisins
+        for cell in changed:
+            for u in self._neighbors(cell):
+                self._update_vertex(u)
+
+        self.compute_shortest_path()
+
+    def path(self):
+        """ Chemin [(col, row), ...] du départ au but, ou None s'il n'y en a pas. """
+        if self.g.get(self.start, INF) == INF and self.rhs.get(self.start, INF) == INF:
+            return None
+
+        path = [self.start]
+        current = self.start
+        while current not in self.goals:
+            best, best_cost = None, INF
+            for s in self._neighbors(current):
+                if self._free(s):
+                    cost = 1 + self.g.get(s, INF)
+                    if cost < best_cost:
+                        best, best_cost = s, cost
+            if best is None or best_cost == INF or len(path) > self.grid_width * self.grid_height:
+                return None
+            path.append(best)
+            current = best
+        return path
@@ -0,0 +1,366 @@
+# episode.py
+#
+# Enregistrement d'une partie et rejeu déterministe. À chaque tick, la boucle
+# de jeu ajoute au journal l'état des obstacles (format de snapshot.py),
+# l'état des grenouilles vu par l'agent et la décision prise (position après
+# l'agent, plan suivi). Le journal est écrit au fil de l'eau, par paquets de
+# quelques ticks, et vidé dès qu'une grenouille meurt.
+#
+#   recorder = episode.EpisodeRecorder('partie.log', world)
+#   ...
+#   recorder.before_agent(world)
+#   agent.act(world, frog)
+#   recorder.after_agent(world)
+#   world.step()
+#   ...
+#   recorder.close()
+#
+# Rejeu sans affichage (morts avec leur contexte), replanification à un tick
+# et comparaison des latences de planificateurs sur les mêmes entrées :
+#
+#   python episode.py partie.log
+#   python episode.py partie.log --tick 120 --planner spatio
+#   python episode.py partie.log --time spatio anytime
+
+import argparse
+import json
+import struct
+import time
+
+import numpy as np
+
+import astar
+import lanes
+import simulation
+import snapshot
+from runner import PLANNERS
+
+MAGIC = b'FRGE'
+VERSION = 1
+PREFIX = struct.Struct('<4sH')
+LENGTH = struct.Struct('<I')
+
+
+def _frog_state(frog):
+    return [frog.rect.x, frog.rect.y, frog.dead, frog.death_cause]
+
+
+class EpisodeRecorder:
+    """
+    Journal d'une partie : un enregistrement par tick, gardé en mémoire par
+    paquets de buffer_ticks ticks au plus avant d'être écrit. Les grenouilles
+    sont celles de world.frogs, repérées par leur rang.
+    """
+    def __init__(self, path, world, buffer_ticks=64):
+        self.header = snapshot.Header.of(world)
+        self.file = open(path, 'wb')
+        self.file.write(PREFIX.pack(MAGIC, VERSION) + self.header.to_bytes())
+        self.file.flush()
+        self.buffer_ticks = buffer_ticks
+        self.buffer = []
+        self.pending = None
+        self.paths = []    # dernier plan enregistré de chaque grenouille
+        self.dead = 0      # grenouilles mortes au tick précédent
+        self.flush_now = False
+        self.count = 0
+
+    def before_agent(self, world):
+        """ Les entrées du planificateur : obstacles et grenouilles avant l'agent. """
+        frame = snapshot.capture_frame(world, self.header)
+        frogs = [_frog_state(frog) for frog in world.frogs]
+        self.pending = (frame, frogs)
+        # Une nouvelle mort est écrite tout de suite, avec les ticks qui l'ont précédée
+        dead = sum(1 for _, _, is_dead, _ in frogs if is_dead)
+        self.flush_now = dead > self.dead
+        self.dead = dead
+
+    def after_agent(self, world):
+        """ La décision de l'agent : position de chaque grenouille et plan suivi. """
+        frame, before = self.pending
+        frogs = []
+        for i, (frog, state) in enumerate(zip(world.frogs, before)):
+            record = {'before': state, 'after': [frog.rect.x, frog.rect.y], 'step': frog.path_step}
+            if i == len(self.paths):
+                record['start'] = [frog.start_centerx, frog.start_y]
+                self.paths.append(None)
+            # Le plan n'est écrit que lorsqu'il change
+            path = [list(p) for p in frog.path]
+            if path != self.paths[i]:
+                record['path'] = path
+                self.paths[i] = path
+            frogs.append(record)
+
+        payload = json.dumps(frogs, separators=(',', ':')).encode()
+        self.buffer.append(frame.tobytes() + LENGTH.pack(len(payload)) + payload)
+        self.pending = None
+        self.count += 1
+        if self.flush_now or len(self.buffer) >= self.buffer_ticks:
+            self.flush()
+
+    def flush(self):
+        self.file.write(b''.join(self.buffer))
+        self.file.flush()
+        self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class Episode:
+    """
+    Une partie enregistrée. ticks[i] est le i-ième tick du journal :
+    (frame, grenouilles), chaque grenouille étant un dict {'before': [x, y,
+    dead, cause], 'after': [x, y], 'step', 'path', 'start'} où le plan et le
+    départ sont complétés à partir des ticks précédents.
+    """
+    def __init__(self, header, ticks):
+        self.header = header
+        self.ticks = ticks
+        self.level = header.level
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def index(self, tick):
+        """ Rang dans le journal du tick de monde `tick`. """
+        for i, (frame, _) in enumerate(self.ticks):
+            if int(frame['tick']) == tick:
+                return i
+        raise KeyError(f"tick {tick} absent du journal")
+
+    def snapshot(self, i):
+        """ Les obstacles du i-ième tick, utilisables directement par les planificateurs. """
+        return snapshot.Snapshot(self.header, self.ticks[i][0], source=self)
+
+    def frogs(self, i):
+        """ Les grenouilles telles que l'agent les a vues au i-ième tick (avant de jouer). """
+        frogs = []
+        for record in self.ticks[i][1]:
+            frog = simulation.Frog(*record['start'])
+            _restore(frog, record)
+            frogs.append(frog)
+        return frogs
+
+    def world_at(self, i):
+        """ Le World et ses grenouilles au i-ième tick, avant l'agent, sans rejouer le début. """
+        world = self.snapshot(i).to_world()
+        frogs = self.frogs(i)
+        world.frogs.add(*frogs)
+        return world, frogs
+
+
+def _restore(frog, record):
+    frog.rect.x, frog.rect.y, frog.dead, frog.death_cause = record['before']
+    frog.path = []
+    frog.path_step = 0
+
+
+def _apply(frog, record):
+    frog.rect.x, frog.rect.y = record['after']
+    frog.path = [tuple(p) for p in record['path']]
+    frog.path_step = record['step']
+
+
+def load(path):
+    """ Relit un journal ; un dernier tick incomplet (écriture interrompue) est ignoré. """
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version = PREFIX.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("ce n'est pas un journal de partie Frogger")
+    if version != VERSION:
+        raise ValueError(f"version de journal non prise en charge : {version}")
+    header, offset = snapshot.Header.from_bytes(data[PREFIX.size:])
+    offset += PREFIX.size
+    frame_size = header.frame_dtype.itemsize
+
+    ticks = []
+    paths, starts = [], []
+    while offset + frame_size + LENGTH.size <= len(data):
+        frame = np.frombuffer(data, header.frame_dtype, 1, offset)[0]
+        (length,) = LENGTH.unpack_from(data, offset + frame_size)
+        end = offset + frame_size + LENGTH.size + length
+        if end > len(data):
+            break
+        frogs = json.loads(data[end - length:end])
+        for i, record in enumerate(frogs):
+            if i == len(paths):
+                paths.append([])
+                starts.append(record['start'])
+            paths[i] = record.setdefault('path', paths[i])
+            record.setdefault('start', starts[i])
+        ticks.append((frame, frogs))
+        offset = end
+    return Episode(header, ticks)
+
+
+def replay(episode):
+    """
+    Rejoue la partie sans affichage et sans planificateur : à chaque tick, les
+    décisions enregistrées sont appliquées puis le monde avance avec
+    World.step. Vérifie que les obstacles et les grenouilles retrouvent
+    l'état enregistré (ValueError sinon). Produit (i, world, frogs, events)
+    au i-ième tick, avant l'agent ; events reçoit les événements de
+    World.step pour ce tick quand le rejeu reprend.
+    """
+    if not len(episode):
+        return
+    world, frogs = episode.world_at(0)
+    for i, (frame, records) in enumerate(episode.ticks):
+        tick = int(frame['tick'])
+        if snapshot.capture_frame(world, episode.header).tobytes() != frame.tobytes():
+            raise ValueError(f"les obstacles divergent du journal au tick {tick}")
+        for k, record in enumerate(records):
+            if k == len(frogs):
+                # Grenouille ajoutée en cours de partie
+                frogs.append(simulation.Frog(*record['start']))
+                _restore(frogs[k], record)
+                world.frogs.add(frogs[k])
+            frog = frogs[k]
+            # La boucle de jeu relance une grenouille morte entre deux ticks
+            if frog.dead and not record['before'][2]:
+                frog.reset()
+            if _frog_state(frog)[:3] != record['before'][:3]:
+                raise ValueError(f"la grenouille {k} diverge du journal au tick {tick}")
+
+        events = []
+        yield i, world, frogs, events
+        for frog, record in zip(frogs, records):
+            if not frog.dead:
+                _apply(frog, record)
+        events.extend(world.step())
+
+
+def fast_forward(episode, i):
+    """ Rejoue les i premiers ticks ; retourne (world, frogs) au i-ième tick, avant l'agent. """
+    for j, world, frogs, _ in replay(episode):
+        if j == i:
+            return world, frogs
+    raise IndexError(f"le journal n'a que {len(episode)} ticks")
+
+
+def replan(episode, i, agent, frog=0):
+    """
+    Rejoue jusqu'au i-ième tick puis relance agent pour la grenouille de
+    rang frog, sans son plan enregistré. Retourne {'recorded': décision
+    enregistrée, 'replanned': décision de l'agent}, chacune {'after' :
+    position après l'agent, 'path', 'step' : plan suivi et prochaine étape}.
+    """
+    world, frogs = fast_forward(episode, i)
+    target = frogs[frog]
+    target.path = []
+    target.path_step = 0
+    agent.act(world, target)
+    record = episode.ticks[i][1][frog]
+    return {'recorded': {'after': record['after'], 'path': [tuple(p) for p in record['path']], 'step': record['step']},
+            'replanned': {'after': [target.rect.x, target.rect.y], 'path': target.path, 'step': target.path_step}}
+
+
+def time_planner(episode, agent, frog=0, repeat=1):
+    """
+    Chronomètre une planification complète (sans plan en cours) de agent à
+    chaque tick enregistré où la grenouille est vivante, sur les obstacles
+    et la position enregistrés : deux versions d'un planificateur se
+    comparent ainsi sur exactement les mêmes entrées. Les instantanés du
+    journal servent de monde ; comme en jeu, chaque planification
+    chronométrée inclut le calcul de la WorldTimeline, faite directement
+    à partir des tableaux de l'instantané (Snapshot.world_sprites).
+    Le cache des voies et les tables d'heuristique sont vidés au départ :
+    chaque planificateur paie le même démarrage à froid, quel que soit
+    l'ordre dans lequel on les chronomètre.
+    Retourne un dict {'plans', 'mean_ms', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms'}.
+    """
+    lanes.default_cache.clear()
+    astar.distance_table.cache_clear()
+    times = []
+    for i in range(len(episode)):
+        record = episode.ticks[i][1][frog]
+        if record['before'][2]:
+            continue
+        best = None
+        for _ in range(repeat):
+            world = episode.snapshot(i)
+            target = simulation.Frog(*record['start'])
+            _restore(target, record)
+            start = time.perf_counter()
+            agent.act(world, target)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        times.append(best)
+    if not times:
+        return {'plans': 0}
+    times = np.array(times) * 1e3
+    return {'plans': len(times), 'mean_ms': float(times.mean()),
+            'p50_ms': float(np.percentile(times, 50)), 'p90_ms': float(np.percentile(times, 90)),
+            'p99_ms': float(np.percentile(times, 99)), 'max_ms': float(times.max())}
+
+
+def deaths(episode):
+    """
+    Les morts de la partie, rejouée : une liste de dicts {'tick', 'frog',
+    'cause', 'cell' : case après la décision de l'agent, 'plan' : suite du
+    plan suivi à ce moment-là}.
+    """
+    result = []
+
+    def collect(i, frogs, events):
+        record_tick, records = episode.ticks[i]
+        for frog, event in events:
+            if event != 'death':
+                continue
+            k = frogs.index(frog)
+            record = records[k]
+            result.append({'tick': int(record_tick['tick']), 'frog': k, 'cause': frog.death_cause,
+                           'cell': [v // astar.TILE_SIZE for v in record['after']],
+                           'plan': [tuple(p) for p in record['path'][record['step']:]]})
+
+    previous = None
+    for i, _, frogs, events in replay(episode):
+        if previous is not None:
+            collect(*previous)
+        previous = (i, frogs, events)
+    if previous is not None:
+        collect(*previous)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejeu d'une partie enregistrée")
+    parser.add_argument('path')
+    parser.add_argument('--tick', type=int, help="tick du monde où relancer le planificateur")
+    parser.add_argument('--planner', choices=sorted(PLANNERS), default='spatio')
+    parser.add_argument('--frog', type=int, default=0, help="rang de la grenouille")
+    parser.add_argument('--time', nargs='+', choices=sorted(PLANNERS), metavar='PLANNER',
+                        help="compare les latences des planificateurs sur les ticks enregistrés")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    recorded = load(args.path)
+    print(f"{len(recorded)} ticks enregistrés")
+
+    if args.time:
+        for name in args.time:
+            stats = time_planner(recorded, PLANNERS[name](), args.frog, args.repeat)
+            print(name, json.dumps(stats))
+    elif args.tick is not None:
+        result = replan(recorded, recorded.index(args.tick), PLANNERS[args.planner](), args.frog)
+        print("décision enregistrée :", result['recorded'])
+        print("décision rejouée     :", result['replanned'])
+    else:
+        found = deaths(recorded)
+        print(f"rejeu identique au journal, {len(found)} mort(s)")
+        for death in found:
+            print(f"tick {death['tick']} : grenouille {death['frog']} morte ({death['cause']}) "
+                  f"en {tuple(death['cell'])}, plan restant {death['plan']}")
+
+
+if __name__ == '__main__':
+    main()
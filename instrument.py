@@ -0,0 +1,154 @@
+# instrument.py
+#
+# Instrumentation optionnelle des chemins chauds : chronomètres nommés et
+# compteurs (nœuds développés, cases écrites, ...) agrégés frame par frame.
+# Désactivée par défaut : chaque appel se résume alors à un test sur une
+# variable globale. Pour l'activer sans toucher au code :
+#
+#   FROGGER_PROFILE=profil.json python frogger.py      (ou profil.csv)
+#
+# ou depuis Python : instrument.enable('profil.json').
+
+import atexit
+import csv
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# Le profileur actif, ou None si l'instrumentation est désactivée
+profiler = None
+
+
+class _NullTimer:
+    """ Chronomètre qui ne fait rien, partagé quand l'instrumentation est désactivée. """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, (time.perf_counter() - self.started) * 1e3)
+        return False
+
+
+class Profiler:
+    """
+    Accumule des valeurs nommées pendant une frame (durées en ms, compteurs)
+    puis les range dans l'historique à chaque end_frame().
+    Le thread de planification (planner_thread.py) ajoute des valeurs
+    pendant que la boucle de jeu termine les frames : un verrou protège
+    la frame en cours.
+    """
+    def __init__(self):
+        self.current = {}  # nom -> valeur cumulée sur la frame en cours
+        self.frames = []   # une entrée par frame terminée
+        self.names = []    # noms dans l'ordre de première apparition
+        self.lock = threading.Lock()
+
+    def add(self, name, value):
+        with self.lock:
+            if name not in self.current:
+                self.current[name] = 0
+                if name not in self.names:
+                    self.names.append(name)
+            self.current[name] += value
+
+    def end_frame(self):
+        with self.lock:
+            self.frames.append(self.current)
+            self.current = {}
+
+    def summary(self, bins=10):
+        """
+        Statistiques par nom sur toutes les frames (une frame sans valeur
+        compte pour 0) : total, moyenne, percentiles et histogramme.
+        """
+        result = {'frames': len(self.frames), 'metrics': {}}
+        for name in self.names:
+            values = np.array([frame.get(name, 0) for frame in self.frames], dtype=float)
+            if not len(values):
+                continue
+            counts, edges = np.histogram(values, bins=bins)
+            result['metrics'][name] = {
+                'total': float(values.sum()),
+                'mean': float(values.mean()),
+                'p50': float(np.percentile(values, 50)),
+                'p90': float(np.percentile(values, 90)),
+                'p99': float(np.percentile(values, 99)),
+                'max': float(values.max()),
+                'histogram': {'edges': edges.tolist(), 'counts': counts.tolist()},
+            }
+        return result
+
+    def dump(self, path):
+        """ Écrit le résumé en JSON, ou les valeurs brutes frame par frame en CSV (selon l'extension). """
+        with self.lock:
+            pending = bool(self.current)
+        if pending:
+            self.end_frame()
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['frame'] + self.names)
+                for i, frame in enumerate(self.frames):
+                    writer.writerow([i] + [frame.get(name, 0) for name in self.names])
+        else:
+            with open(path, 'w') as f:
+                json.dump(self.summary(), f, indent=2)
+
+
+def enable(path=None):
+    """
+    Active l'instrumentation et retourne le profileur. Si path est donné,
+    le profil y est écrit à la sortie du programme (.json ou .csv).
+    """
+    global profiler
+    profiler = Profiler()
+    if path:
+        atexit.register(profiler.dump, path)
+    return profiler
+
+
+def disable():
+    global profiler
+    profiler = None
+
+
+def timer(name):
+    """ Chronomètre un bloc : with instrument.timer('search'): ... """
+    if profiler is None:
+        return _NULL_TIMER
+    return _Timer(profiler, name)
+
+
+def count(name, n=1):
+    """ Ajoute n au compteur name pour la frame en cours. """
+    if profiler is not None:
+        profiler.add(name, n)
+
+
+def end_frame():
+    """ Termine la frame en cours (appelé une fois par tour de boucle). """
+    if profiler is not None:
+        profiler.end_frame()
+
+
+if os.environ.get('FROGGER_PROFILE'):
+    enable(os.environ['FROGGER_PROFILE'])
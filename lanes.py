@@ -0,0 +1,638 @@
+# lanes.py
+#
+# Le monde du Frogger est périodique : chaque voie avance à vitesse constante
+# et boucle au bord de l'écran, et les tortues plongent sur un cycle fixe.
+# On calcule donc l'occupation d'une voie une seule fois sur toute sa période
+# (LaneTimeline) et on la réutilise pour toutes les frames et tous les plans,
+# grâce à un cache LRU indexé par (vitesse, disposition des sprites, phase).
+
+import bisect
+from collections import OrderedDict
+import math
+
+import pygame
+
+import instrument
+from level import DEFAULT_LEVEL, DIVE_PERIOD, TILE_SIZE
+
+
+def strict_mask(left, right, grid_width):
+    """
+    Colonnes (en bitmask) qui chevauchent [left, right[ en pixels :
+    la règle de create_grid et des collisions pygame.
+    """
+    start_col = max(0, left // TILE_SIZE)
+    end_col = min(grid_width - 1, (right - 1) // TILE_SIZE)
+    if start_col > end_col:
+        return 0
+    return ((1 << (end_col - start_col + 1)) - 1) << start_col
+
+
+def inclusive_mask(left, right, grid_width):
+    """
+    Colonnes (en bitmask) qui touchent [left, right] en pixels, bornes
+    incluses : la règle de is_walkable_at_time.
+    """
+    start_col = max(0, -(-left // TILE_SIZE) - 1)
+    end_col = min(grid_width - 1, right // TILE_SIZE)
+    if start_col > end_col:
+        return 0
+    return ((1 << (end_col - start_col + 1)) - 1) << start_col
+
+
+def mask_to_row(mask, grid_width):
+    """ Convertit un bitmask de colonnes en liste de 0/1. """
+    return [(mask >> col) & 1 for col in range(grid_width)]
+
+
+class LaneTimeline:
+    """
+    L'occupation d'une voie à chaque tick, depuis un état de départ (phase 0)
+    jusqu'à la fin de son premier cycle. Les phases 0..transient-1 ne sont
+    visitées qu'une fois, les suivantes se répètent avec la période `period`.
+    Le cycle de la voie est le PPCM des cycles de ses sprites, qui peut
+    compter des milliers de phases sur un grand plateau : on ne garde que la
+    suite courte des positions de chaque sprite sur son propre cycle, et
+    les bitmasks d'une phase sont calculés à la demande (masks), puis gardés
+    dans un cache borné.
+    ever_free / ever_covered résument tout le cycle (règle stricte) : les
+    colonnes libres, resp. couvertes par un sprite, à au moins une phase.
+    """
+    # Nombre de phases dont les bitmasks restent en cache
+    MAX_CACHED_PHASES = 4096
+    # Au-delà de ce cycle (en ticks), ever_free n'est plus calculé exactement
+    # mais vaut toutes les colonnes : un sur-ensemble, comme le veut
+    # passable_masks
+    MAX_EXACT_PERIOD = 1 << 22
+
+    def __init__(self, move_rect, speed, sprites, screen_width, grid_width):
+        # sprites : liste de (x, y, width, height, plonge)
+        self.speed = speed
+        self.grid_width = grid_width
+        self.widths = [w for _, _, w, _, _ in sprites]
+        self.dives = [d for _, _, _, _, d in sprites]
+
+        # Chaque sprite suit la même fonction de déplacement : on garde ses
+        # positions jusqu'au premier retour à une position déjà vue, soit son
+        # régime transitoire puis un cycle.
+        self.positions = []  # par sprite : (xs, transitoire, période)
+        transient, period = 0, 1
+        for x, y, w, h, _ in sprites:
+            rect = pygame.Rect(x, y, w, h)
+            seen = {}
+            tick = 0
+            while rect.x not in seen:
+                seen[rect.x] = tick
+                move_rect(rect, speed, screen_width)
+                tick += 1
+            self.positions.append((list(seen), seen[rect.x], tick - seen[rect.x]))
+            transient = max(transient, seen[rect.x])
+            period = period * (tick - seen[rect.x]) // math.gcd(period, tick - seen[rect.x])
+
+        self.transient = transient
+        self.period = period
+        self._masks = {}
+        self._ever_free = None
+        # Phases dont l'état est déjà enregistré dans un LaneCache
+        self.registered = 0
+
+        self.ever_covered = 0
+        for (xs, _, _), width in zip(self.positions, self.widths):
+            for x in xs:
+                self.ever_covered |= strict_mask(x, x + width, grid_width)
+
+    def index(self, phase, time):
+        """ Indice de la phase atteinte après `time` ticks depuis la phase `phase`. """
+        i = phase + time
+        if i >= self.transient + self.period:
+            i = self.transient + (i - self.transient) % self.period
+        return i
+
+    def xs(self, i):
+        """ Abscisse de chaque sprite à la phase i. """
+        result = []
+        for xs, transient, period in self.positions:
+            if i >= len(xs):
+                i_sprite = transient + (i - transient) % period
+            else:
+                i_sprite = i
+            result.append(xs[i_sprite])
+        return result
+
+    def state(self, i):
+        """ Disposition des sprites à la phase i : (x, largeur, plonge) triés. """
+        return tuple(sorted(zip(self.xs(i), self.widths, self.dives)))
+
+    def masks(self, i):
+        """
+        Bitmasks de colonnes de la phase i : (strict_fixed, strict_divers,
+        inclusive_fixed, inclusive_divers, swept) pour les règles stricte /
+        inclusive, sprites fixes / tortues plongeantes. swept est le bitmask
+        (règle stricte) des colonnes balayées par les sprites pendant leur
+        déplacement continu de la phase i à la suivante, sauf pendant le
+        saut d'un bord de l'écran à l'autre.
+        """
+        masks = self._masks.get(i)
+        if masks is not None:
+            return masks
+
+        grid_width = self.grid_width
+        step = abs(self.speed) + 1
+        result = [0, 0, 0, 0, 0]
+        for x, next_x, width, d in zip(self.xs(i), self.xs(self.index(i, 1)), self.widths, self.dives):
+            strict = strict_mask(x, x + width, grid_width)
+            result[d] |= strict
+            result[2 + d] |= inclusive_mask(x, x + width, grid_width)
+            if abs(next_x - x) <= step:
+                result[4] |= strict_mask(min(x, next_x), max(x, next_x) + width, grid_width)
+            else:
+                # Bouclage : le sprite disparaît d'un bord et réapparaît à l'autre
+                result[4] |= strict | strict_mask(next_x, next_x + width, grid_width)
+        masks = tuple(result)
+
+        if len(self._masks) >= self.MAX_CACHED_PHASES:
+            self._masks.clear()
+        self._masks[i] = masks
+        return masks
+
+    @property
+    def ever_free(self):
+        """ Colonnes libres à au moins une phase, calculées au premier appel. """
+        if self._ever_free is None:
+            self._ever_free = self._compute_ever_free()
+        return self._ever_free
+
+    def _compute_ever_free(self):
+        full = (1 << self.grid_width) - 1
+        ever_free = 0
+        for i in range(self.transient):
+            fixed, divers = self.masks(i)[:2]
+            ever_free |= full & ~(fixed | divers)
+        if self.period > self.MAX_EXACT_PERIOD:
+            return full
+
+        # Sur le cycle, une colonne est toujours couverte si les ticks où
+        # chaque sprite la couvre recouvrent tout le cycle. Ces ticks forment
+        # un bitset (un entier) de la période du sprite ; les sprites de même
+        # période sont réunis, puis chaque bitset est répété jusqu'à la
+        # période de la voie.
+        covered_ticks = {}  # période -> colonne -> bitset des ticks couverts
+        for (xs, transient, period), width in zip(self.positions, self.widths):
+            columns = covered_ticks.setdefault(period, {})
+            for j in range(period):
+                x = xs[transient + (self.transient - transient + j) % period]
+                mask = strict_mask(x, x + width, self.grid_width)
+                while mask:
+                    col = mask.bit_length() - 1
+                    columns[col] = columns.get(col, 0) | (1 << j)
+                    mask ^= 1 << col
+
+        all_ticks = (1 << self.period) - 1
+        always_covered = full
+        for col in range(self.grid_width):
+            covered = 0
+            for period, columns in covered_ticks.items():
+                ticks = columns.get(col, 0)
+                length = period
+                while length < self.period:
+                    ticks |= ticks << length
+                    length *= 2
+                covered |= ticks
+            if covered & all_ticks != all_ticks:
+                always_covered &= ~(1 << col)
+        return ever_free | (full & ~always_covered)
+
+
+class LaneCache:
+    """
+    Cache LRU de LaneTimeline. Chaque état de voie (vitesse, disposition
+    des sprites) rencontré dans un cycle déjà calculé est retrouvé en O(1)
+    avec sa phase, même plusieurs milliers de frames plus tard. Les états
+    d'un cycle sont enregistrés par fenêtres de STATE_WINDOW phases, au fur
+    et à mesure que le monde avance.
+    """
+    STATE_WINDOW = 256
+
+    def __init__(self, max_lanes=256):
+        self.max_lanes = max_lanes
+        self.timelines = OrderedDict()  # id -> (timeline, clés enregistrées)
+        self.phases = {}                # clé -> (timeline, phase)
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, sprites, screen_width=DEFAULT_LEVEL.screen_width, grid_width=DEFAULT_LEVEL.grid_width):
+        """
+        Retourne (timeline, phase) pour une voie : une liste de sprites de la
+        même classe, à la même vitesse et sur la même ligne.
+        """
+        first = sprites[0]
+        return self.lookup_lane(type(first), first.speed,
+                                [(s.rect.x, s.rect.y, s.rect.width, s.rect.height, _dives(s)) for s in sprites],
+                                screen_width, grid_width)
+
+    def lookup_lane(self, sprite_type, speed, sprites, screen_width=DEFAULT_LEVEL.screen_width,
+                    grid_width=DEFAULT_LEVEL.grid_width):
+        """
+        Comme lookup, pour une voie décrite sans sprites : la classe de ses
+        sprites (pour move_rect), sa vitesse et une liste de
+        (x, y, width, height, plonge).
+        """
+        move_rect = sprite_type.move_rect
+        layout = tuple(sorted((x, w, d) for x, _, w, _, d in sprites))
+        lane_key = (sprite_type.__name__, speed, sprites[0][1], sprites[0][3], screen_width, grid_width)
+        key = lane_key + (layout,)
+
+        entry = self.phases.get(key)
+        if entry is not None:
+            self.hits += 1
+            timeline, phase = entry
+            self.timelines.move_to_end(id(timeline))
+            keys = self.timelines[id(timeline)][1]
+            if phase + self.STATE_WINDOW // 2 >= timeline.registered:
+                self._register(timeline, lane_key, keys, timeline.registered)
+            return entry
+
+        self.misses += 1
+        timeline = LaneTimeline(move_rect, speed, sprites, screen_width, grid_width)
+        keys = []
+        self.timelines[id(timeline)] = (timeline, keys)
+        self._register(timeline, lane_key, keys, 0)
+
+        # Éviction de la voie la moins récemment utilisée
+        while len(self.timelines) > self.max_lanes:
+            _, (_, old_keys) = self.timelines.popitem(last=False)
+            for old_key in old_keys:
+                del self.phases[old_key]
+
+        return self.phases.get(key, (timeline, 0))
+
+    def _register(self, timeline, lane_key, keys, start):
+        """ Enregistre les états des STATE_WINDOW phases suivantes de timeline. """
+        stop = min(start + self.STATE_WINDOW, timeline.transient + timeline.period)
+        for phase in range(start, stop):
+            state_key = lane_key + (timeline.state(phase),)
+            if state_key not in self.phases:
+                self.phases[state_key] = (timeline, phase)
+                keys.append(state_key)
+        timeline.registered = max(stop, timeline.registered)
+
+    def clear(self):
+        self.timelines.clear()
+        self.phases.clear()
+
+
+def _dives(sprite):
+    return 1 if getattr(sprite, 'canDive', 0) == 2 else 0
+
+
+class LaneIndex:
+    """
+    Index spatial des sprites par ligne de grille. Chaque ligne garde ses
+    sprites triés par x : on trouve ceux qui chevauchent un intervalle de
+    pixels par dichotomie, pour un coût qui dépend des sprites d'une seule
+    voie et non du nombre total de sprites.
+    Un sprite ne boucle qu'en sautant d'un bord à l'autre (son rectangle
+    n'est jamais coupé en deux) : les requêtes restent de simples
+    intervalles, mais refresh() doit être appelé après chaque déplacement
+    pour replacer les sprites qui ont bouclé.
+    """
+    def __init__(self, sprites):
+        self.order = {}      # sprite -> rang dans l'ordre de mise à jour
+        self.rows = {}       # ligne -> sprites triés par x
+        self.lefts = {}      # ligne -> bords gauches triés
+        self.max_width = {}  # ligne -> largeur du plus grand sprite
+        for i, sprite in enumerate(sprites):
+            self.order[sprite] = i
+            for row in range(sprite.rect.top // TILE_SIZE, (sprite.rect.bottom - 1) // TILE_SIZE + 1):
+                self.rows.setdefault(row, []).append(sprite)
+                self.max_width[row] = max(self.max_width.get(row, 0), sprite.rect.width)
+        self.refresh()
+
+    def refresh(self):
+        """ Retrie chaque ligne (presque triée d'un tick à l'autre : coût quasi linéaire). """
+        for row, sprites in self.rows.items():
+            sprites.sort(key=_left)
+            self.lefts[row] = [sprite.rect.left for sprite in sprites]
+
+    def query(self, row, left, right):
+        """ Sprites de la ligne qui chevauchent [left, right[ en pixels, triés par x. """
+        sprites = self.rows.get(row)
+        if not sprites:
+            return []
+        lefts = self.lefts[row]
+        # Un sprite qui commence avant left - max_width finit avant left
+        lo = bisect.bisect_right(lefts, left - self.max_width[row])
+        hi = bisect.bisect_left(lefts, right)
+        instrument.count('collision_checks', hi - lo)
+        return [sprite for sprite in sprites[lo:hi] if sprite.rect.right > left]
+
+    def overlapping(self, rect):
+        """ Sprites qui chevauchent rect (comme colliderect), dans l'ordre de mise à jour. """
+        found = set()
+        for row in range(rect.top // TILE_SIZE, (rect.bottom - 1) // TILE_SIZE + 1):
+            found.update(sprite for sprite in self.query(row, rect.left, rect.right)
+                         if sprite.rect.colliderect(rect))
+        return sorted(found, key=self.order.__getitem__)
+
+    def first_overlapping(self, rect, after=-1):
+        """ Le premier sprite (dans l'ordre de mise à jour, rang > after) qui chevauche rect, ou None. """
+        for sprite in self.overlapping(rect):
+            if self.order[sprite] > after:
+                return sprite
+        return None
+
+    def row_sprites(self, row, world_sprites):
+        """ world_sprites réduit aux sprites d'une ligne : (cars, logs, turtles, turtle_counter). """
+        cars, logs, turtles, turtle_counter = world_sprites
+        sprites = self.rows.get(row, [])
+        return ([s for s in sprites if s in cars], [s for s in sprites if s in logs],
+                [s for s in sprites if s in turtles], turtle_counter)
+
+
+def _left(sprite):
+    return sprite.rect.left
+
+
+def _sprite_lanes(sprites, grid_height):
+    """ Une voie = sprites de même classe, même ligne et même vitesse. """
+    groups = {}
+    for sprite in sprites:
+        row = sprite.rect.top // TILE_SIZE
+        if 0 <= row < grid_height:
+            groups.setdefault((row, type(sprite), sprite.speed), []).append(
+                (sprite.rect.x, sprite.rect.y, sprite.rect.width, sprite.rect.height, _dives(sprite)))
+    return [(row, sprite_type, speed, group) for (row, sprite_type, speed), group in groups.items()]
+
+
+# Cache partagé par les deux planificateurs, assez grand pour les plateaux de
+# plusieurs milliers de voies
+default_cache = LaneCache(max_lanes=4096)
+
+
+class WorldTimeline:
+    """
+    Prédiction exacte du monde à partir de world_sprites, en s'appuyant sur le
+    cache des voies : positions avec bouclage au bord de l'écran, arrondis de
+    pygame et cycle de plongée des tortues.
+    level est le plateau (level.Level) du monde, le niveau d'origine par défaut.
+    """
+    def __init__(self, world_sprites, level=None, cache=None):
+        cars, logs, turtles, turtle_counter = world_sprites
+        grid_height = (DEFAULT_LEVEL if level is None else level).grid_height
+
+        # État de plongée courant des tortues plongeantes
+        divers_state = 0
+        for turtle in turtles:
+            if _dives(turtle):
+                divers_state = turtle.state
+                break
+
+        self._build(_sprite_lanes(cars, grid_height), _sprite_lanes(list(logs) + list(turtles), grid_height),
+                    turtle_counter, divers_state, level, cache)
+
+    @classmethod
+    def from_lanes(cls, car_lanes, surface_lanes, turtle_counter, divers_state, level=None, cache=None):
+        """
+        La WorldTimeline d'obstacles décrits sans sprites (par exemple un
+        instantané) : car_lanes et surface_lanes sont des listes de
+        (ligne, classe des sprites, vitesse, [(x, y, width, height, plonge), ...]).
+        """
+        timeline = cls.__new__(cls)
+        timeline._build(car_lanes, surface_lanes, turtle_counter, divers_state, level, cache)
+        return timeline
+
+    def _build(self, car_lanes, surface_lanes, turtle_counter, divers_state, level, cache):
+        if level is None:
+            level = DEFAULT_LEVEL
+        if cache is None:
+            cache = default_cache
+        self.grid_width = level.grid_width
+        self.grid_height = level.grid_height
+        self.river_rows = level.river_rows
+        self.goal_rows = level.goal_rows
+        self.turtle_counter = turtle_counter
+        self.divers_state = divers_state
+        self.car_lanes = self._lanes(car_lanes, cache, level.screen_width)
+        self.surface_lanes = self._lanes(surface_lanes, cache, level.screen_width)
+
+    def _lanes(self, lane_sprites, cache, screen_width):
+        return [(row,) + cache.lookup_lane(sprite_type, speed, sprites, screen_width, self.grid_width)
+                for row, sprite_type, speed, sprites in lane_sprites]
+
+    def divers_diving(self, time):
+        """ Les tortues plongeantes sont-elles sous l'eau après `time` ticks ? """
+        return self.divers_state ^ (((self.turtle_counter + time) // DIVE_PERIOD) % 2) == 1
+
+    def row_masks(self, time, inclusive=False):
+        """
+        Retourne (car_masks, surface_masks) : pour chaque ligne, le bitmask
+        des colonnes occupées par une voiture / par une surface sûre.
+        """
+        car_masks = [0] * self.grid_height
+        surface_masks = [0] * self.grid_height
+        diving = self.divers_diving(time)
+
+        first = 2 if inclusive else 0
+        for row, timeline, phase in self.car_lanes:
+            masks = timeline.masks(timeline.index(phase, time))
+            car_masks[row] |= masks[first] | masks[first + 1]
+
+        for row, timeline, phase in self.surface_lanes:
+            masks = timeline.masks(timeline.index(phase, time))
+            surface_masks[row] |= masks[first]
+            if not diving:
+                surface_masks[row] |= masks[first + 1]
+
+        return car_masks, surface_masks
+
+    def blocked_masks(self, time, inclusive=False):
+        """ Bitmask des cases dangereuses pour chaque ligne après `time` ticks. """
+        car_masks, surface_masks = self.row_masks(time, inclusive)
+        full = (1 << self.grid_width) - 1
+        blocked = []
+        for row in range(self.grid_height):
+            mask = car_masks[row]
+            if row in self.river_rows:
+                mask |= full & ~surface_masks[row]
+            blocked.append(mask)
+        return blocked
+
+    def frog_blocked_masks(self, time, swept=False):
+        """
+        Bitmask des cases où une grenouille meurt si son plan l'y place
+        pendant le tick time -> time+1, en suivant l'ordre exact de
+        simulation.World.step :
+        - l'eau est vérifiée juste après son déplacement : sprites à time+1,
+          tortues dans l'état de time (elles changent en fin de tick) ;
+        - les voitures et tortues plongeantes la touchent au tick suivant :
+          sprites à time+2, tortues dans l'état de time+1.
+        Les lignes d'arrivée sont toujours sûres : la traversée y est gagnée.
+        Avec swept=True, une voiture bloque aussi les cases qu'elle traverse
+        entre time+1 et time+2 (collision en temps continu) : plus prudent
+        que la simulation, qui ne teste les collisions qu'aux ticks entiers.
+        """
+        surface_masks = [0] * self.grid_height
+        danger_masks = [0] * self.grid_height
+        diving_now = self.divers_diving(time)
+        diving_next = self.divers_diving(time + 1)
+
+        for row, timeline, phase in self.surface_lanes:
+            fixed, divers = timeline.masks(timeline.index(phase, time + 1))[:2]
+            surface_masks[row] |= fixed
+            if not diving_now:
+                surface_masks[row] |= divers
+            if diving_next:
+                danger_masks[row] |= timeline.masks(timeline.index(phase, time + 2))[1]
+
+        for row, timeline, phase in self.car_lanes:
+            if swept:
+                danger_masks[row] |= timeline.masks(timeline.index(phase, time + 1))[4]
+            else:
+                masks = timeline.masks(timeline.index(phase, time + 2))
+                danger_masks[row] |= masks[0] | masks[1]
+
+        full = (1 << self.grid_width) - 1
+        blocked = []
+        for row in range(self.grid_height):
+            if row in self.goal_rows:
+                blocked.append(0)
+                continue
+            mask = danger_masks[row]
+            if row in self.river_rows:
+                mask |= full & ~surface_masks[row]
+            blocked.append(mask)
+        return blocked
+
+    def safe_intervals(self, max_time, swept=False):
+        """ Les intervalles sûrs de chaque case jusqu'à max_time (voir SafeIntervals). """
+        return SafeIntervals(self, max_time, swept)
+
+    def passable_masks(self):
+        """
+        Pour chaque ligne, bitmask des cases qui peuvent être sûres à au moins
+        un instant du cycle des voies (tortues plongeantes comprises) : un
+        sur-ensemble des cases sûres à chaque tick, qui ne dépend que de la
+        disposition du niveau. C'est la carte des tables d'heuristique.
+        """
+        full = (1 << self.grid_width) - 1
+        passable = [full] * self.grid_height
+        surfaces = [0] * self.grid_height
+        for row, timeline, _ in self.car_lanes:
+            passable[row] &= timeline.ever_free
+        for row, timeline, _ in self.surface_lanes:
+            surfaces[row] |= timeline.ever_covered
+        for row in range(self.grid_height):
+            if row in self.goal_rows:
+                passable[row] = full
+            elif row in self.river_rows:
+                passable[row] &= surfaces[row]
+        return tuple(passable)
+
+    def grid(self, time=0):
+        """ Grille 2D (0 = praticable, 1 = obstacle) après `time` ticks, comme create_grid. """
+        instrument.count('grid_cells_written', self.grid_width * self.grid_height)
+        return [mask_to_row(mask, self.grid_width) for mask in self.blocked_masks(time)]
+
+    def conservative_grid(self, time=0):
+        """ Obstacle maintenant OU au tick suivant, comme astar.conservative_grid. """
+        instrument.count('grid_cells_written', self.grid_width * self.grid_height)
+        now = self.blocked_masks(time)
+        after = self.blocked_masks(time + 1)
+        return [mask_to_row(a | b, self.grid_width) for a, b in zip(now, after)]
+
+    def is_walkable(self, col, row, time):
+        """ La case (col, row) est-elle sûre après `time` ticks (règle inclusive) ? """
+        instrument.count('walkability_calls')
+        if not (0 <= col < self.grid_width and 0 <= row < self.grid_height):
+            return False
+        return not (self.blocked_masks(time, inclusive=True)[row] >> col) & 1
+
+
+class SafeIntervals:
+    """
+    Pour chaque case, les intervalles de temps [start, end] (en ticks, bornes
+    incluses) pendant lesquels une grenouille y survit, au sens de
+    WorldTimeline.frog_blocked_masks, jusqu'à l'horizon max_time : un
+    intervalle encore ouvert finit à max_time et continue si on prolonge
+    l'horizon avec extend().
+    Les intervalles sont échantillonnés tick par tick sur les cycles de
+    voies en cache : extend() lit les bitmasks de chaque ligne à chaque
+    tick et n'écrit que les changements d'état des cases (ou exclusif avec
+    le tick précédent). Le coût est donc en O(horizon x lignes), plus un
+    terme par intervalle ; seule la mémoire dépend du nombre d'intervalles.
+    Ce ne sont pas des intervalles calculés analytiquement voie par voie.
+    blocked_masks (fonction time -> bitmasks des lignes) remplace la règle
+    de frog_blocked_masks, par exemple celle d'un OccupancyTensor.
+    """
+    def __init__(self, timeline, max_time, swept=False, blocked_masks=None):
+        if blocked_masks is None:
+            def blocked_masks(time):
+                return timeline.frog_blocked_masks(time, swept)
+        self.blocked_masks = blocked_masks
+        self.grid_width = timeline.grid_width
+        self.grid_height = timeline.grid_height
+        # Par case (row * grid_width + col) : débuts des intervalles et fins
+        # des intervalles fermés (le dernier peut être encore ouvert)
+        self.starts = [[] for _ in range(self.grid_width * self.grid_height)]
+        self.ends = [[] for _ in range(self.grid_width * self.grid_height)]
+        self.safe = [0] * self.grid_height  # bitmasks des cases sûres à max_time
+        self.max_time = -1
+        self.extend(max_time)
+
+    def extend(self, max_time):
+        """ Prolonge les intervalles jusqu'à l'horizon max_time. """
+        width = self.grid_width
+        full = (1 << width) - 1
+        safe = self.safe
+        for time in range(self.max_time + 1, max_time + 1):
+            for row, blocked in enumerate(self.blocked_masks(time)):
+                now = full & ~blocked
+                changed = now ^ safe[row]
+                while changed:
+                    bit = changed & -changed
+                    changed ^= bit
+                    cell = row * width + bit.bit_length() - 1
+                    if now & bit:
+                        self.starts[cell].append(time)
+                    else:
+                        self.ends[cell].append(time - 1)
+                safe[row] = now
+        self.max_time = max(self.max_time, max_time)
+
+    def end(self, cell, i):
+        """ Fin de l'intervalle i de la case cell (max_time s'il est encore ouvert). """
+        ends = self.ends[cell]
+        return ends[i] if i < len(ends) else self.max_time
+
+    def intervals(self, col, row):
+        """ Liste des intervalles (start, end) de la case. """
+        cell = row * self.grid_width + col
+        return [(start, self.end(cell, i)) for i, start in enumerate(self.starts[cell])]
+
+    def interval(self, col, row, time):
+        """ Rang de l'intervalle de la case qui contient time, ou None. """
+        if not (0 <= col < self.grid_width and 0 <= row < self.grid_height):
+            return None
+        cell = row * self.grid_width + col
+        i = bisect.bisect_right(self.starts[cell], time) - 1
+        if i >= 0 and time <= self.end(cell, i):
+            return i
+        return None
+
+    def is_walkable(self, col, row, time):
+        return self.interval(col, row, time) is not None
+
+    def count(self):
+        """ Nombre total d'intervalles, à comparer aux (cases x ticks) d'un OccupancyTensor. """
+        return sum(len(starts) for starts in self.starts)
+
+
+def as_timeline(world_sprites, level=None, cache=None):
+    """
+    La WorldTimeline de world_sprites, ou world_sprites tel quel s'il s'agit
+    déjà d'une WorldTimeline (photographie du monde prise par un autre thread,
+    voir planner_thread.WorldSnapshot).
+    """
+    if isinstance(world_sprites, WorldTimeline):
+        return world_sprites
+    return WorldTimeline(world_sprites, level, cache)
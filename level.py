@@ -0,0 +1,132 @@
+# level.py
+#
+# Description d'un plateau de Frogger : taille de la grille, voies (type,
+# ligne, vitesse, sprites), lignes de la rivière, ligne d'arrivée et départ
+# de la grenouille. La simulation, les grilles, les planificateurs et la
+# simulation vectorisée lisent le plateau ici au lieu de supposer un écran
+# de 350x400 pixels, ce qui permet de les essayer sur de très grands plateaux.
+
+import random
+
+# Taille de chaque case de la grille en pixels
+TILE_SIZE = 25
+DIVE_PERIOD = 50  # nombre de frames entre deux changements d'état des tortues
+
+# Largeur en pixels de chaque style de sprite (les images de render.py)
+CAR_WIDTHS = {'yellow': 25, 'dozer': 25, 'purple': 25, 'green': 25, 'truck': 50}
+LOG_WIDTHS = {'short': 62.5, 'medium': 87.5, 'long': 150}
+TURTLE_WIDTHS = {2: 50, 3: 75}
+
+
+class Lane:
+    """
+    Une voie : des sprites de même type ('car', 'log' ou 'turtle'), de même
+    style et de même vitesse (en pixels par tick, signée) sur une ligne.
+    style est l'image de la voiture, la taille de la bûche ou le nombre de
+    tortues ; divers donne les indices (dans xs) des tortues qui plongent.
+    """
+    def __init__(self, kind, row, speed, xs, width, style, divers=()):
+        self.kind = kind
+        self.row = row
+        self.speed = speed
+        self.xs = list(xs)  # abscisses de départ en pixels
+        self.width = width
+        self.style = style
+        self.divers = set(divers)
+
+
+class Level:
+    """
+    Un plateau de grid_width x grid_height cases. Les lignes 0 à goal_row
+    forment l'arrivée (goal_cols : colonnes des nénuphars visés), les lignes
+    de river_rows sont de l'eau hors des bûches et des tortues, et la
+    grenouille part au milieu de la ligne start_row.
+    """
+    def __init__(self, grid_width, grid_height, lanes, river_rows, goal_row, start_row, goal_cols):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.screen_width = grid_width * TILE_SIZE
+        self.screen_height = grid_height * TILE_SIZE
+        self.lanes = lanes
+        self.river_rows = river_rows
+        self.goal_row = goal_row
+        self.goal_rows = range(0, goal_row + 1)
+        self.start_row = start_row
+        self.goal_cols = goal_cols
+
+    def goal_positions(self):
+        """ Les nénuphars (col, row) en coordonnées de grille. """
+        return [(col, self.goal_row) for col in self.goal_cols]
+
+    def in_river(self, y):
+        """ Une grenouille à l'ordonnée y (pixels) est-elle dans la rivière ? """
+        return (self.river_rows.start - 1) * TILE_SIZE < y <= (self.river_rows.stop - 1) * TILE_SIZE
+
+    def reached_goal(self, y):
+        """ Une grenouille à l'ordonnée y (pixels) a-t-elle atteint l'arrivée ? """
+        return y <= self.goal_row * TILE_SIZE
+
+
+# Le niveau d'origine du jeu (14x16 cases)
+DEFAULT_LEVEL = Level(
+    grid_width=14, grid_height=16,
+    lanes=[
+        Lane('turtle', 7, -2, [0, 100, 200, 300], 75, 3, divers=[0, 3]),
+        Lane('turtle', 4, -2.5, [0, 87.5, 175, 262.5], 50, 2, divers=[2]),
+        Lane('log', 6, 3, [0, 150, 300], 62.5, 'short'),
+        Lane('log', 5, 4, [0, 200, 400], 150, 'long'),
+        Lane('log', 3, 2, [0, 150, 300], 87.5, 'medium'),
+        Lane('car', 13, -6, [0, 75, 150], 25, 'yellow'),
+        Lane('car', 12, 2, [0, 75, 150], 25, 'dozer'),
+        Lane('car', 11, -4, [0, 75, 150], 25, 'purple'),
+        Lane('car', 10, 10, [0], 25, 'green'),
+        Lane('car', 9, -3, [0, 150], 50, 'truck'),
+    ],
+    river_rows=range(3, 8), goal_row=2, start_row=14, goal_cols=range(1, 13, 2),
+)
+
+
+def random_level(grid_width, grid_height, seed=0, river_fraction=0.5):
+    """
+    Un plateau aléatoire de la même forme que le niveau d'origine : arrivée
+    (lignes 0 à 2), rivière, une ligne de repos, route, ligne de départ et
+    une ligne vide en bas. river_fraction des voies sont dans la rivière.
+    Les vitesses sont entières pour garder des cycles de voie courts.
+    """
+    rng = random.Random(seed)
+    screen_width = grid_width * TILE_SIZE
+    lane_rows = grid_height - 6  # toutes les lignes sauf arrivée, repos, départ et bas
+    river_count = max(1, int(lane_rows * river_fraction))
+    river_rows = range(3, 3 + river_count)
+    road_rows = range(river_rows.stop + 1, grid_height - 2)
+
+    def spaced_xs(width, coverage):
+        # Sprites régulièrement espacés, décalés au hasard
+        count = max(1, int(screen_width * coverage / width))
+        step = screen_width / count
+        offset = rng.uniform(0, step)
+        return [int(offset + i * step) for i in range(count)]
+
+    lanes = []
+    for row in river_rows:
+        speed = rng.randint(1, 4)
+        # Les bûches bouclent vers la droite, les tortues vers la gauche
+        if rng.random() < 0.5:
+            style = rng.choice(list(LOG_WIDTHS))
+            width = LOG_WIDTHS[style]
+            lanes.append(Lane('log', row, speed, spaced_xs(width, 0.6), width, style))
+        else:
+            style = rng.choice(list(TURTLE_WIDTHS))
+            width = TURTLE_WIDTHS[style]
+            xs = spaced_xs(width, 0.6)
+            divers = [i for i in range(len(xs)) if rng.random() < 1 / 3]
+            lanes.append(Lane('turtle', row, -speed, xs, width, style, divers))
+
+    for row in road_rows:
+        style = rng.choice(list(CAR_WIDTHS))
+        width = CAR_WIDTHS[style]
+        speed = rng.randint(1, 5) * rng.choice([-1, 1])
+        lanes.append(Lane('car', row, speed, spaced_xs(width, 0.25), width, style))
+
+    return Level(grid_width, grid_height, lanes, river_rows, goal_row=2,
+                 start_row=grid_height - 2, goal_cols=range(1, grid_width - 1, 2))
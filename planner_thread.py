@@ -0,0 +1,254 @@
+# planner_thread.py
+#
+# Planification en arrière-plan : la recherche tourne dans un thread à partir
+# d'une photographie du monde, pendant que la boucle de jeu continue
+# d'afficher et de traiter les événements. La boucle récupère le dernier plan
+# terminé et le recale sur le tick courant (le monde a avancé pendant la
+# recherche).
+#
+#   agent = AsyncSpatioTemporalAgent(SpatioTemporalAgent())
+#   ...
+#   agent.act(world, frog)   # ne bloque jamais sur la recherche
+#   ...
+#   agent.stop()
+
+import threading
+
+import astar
+import lanes
+
+
+class WorldSnapshot:
+    """
+    Photographie d'un World au tick courant (voies, tortues, compteur de
+    plongée), utilisable par les agents à la place du monde depuis un autre
+    thread : elle ne lit plus les sprites qui continuent de bouger.
+    cache est le lanes.LaneCache des voies de la photographie : un cache
+    propre au thread de planification, pas lanes.default_cache que la
+    boucle de jeu utilise en même temps.
+    """
+    def __init__(self, world, cache=None):
+        self.source = world  # seulement pour reconnaître le monde (agents.source_world)
+        self.tick = world.tick
+        self.level = world.level
+        self.timeline = lanes.WorldTimeline(world.world_sprites(), world.level, cache)
+
+    def world_sprites(self):
+        return self.timeline
+
+
+class PlannerThread:
+    """
+    Exécute plan(*request) dans un thread d'arrière-plan. submit() dépose une
+    demande (elle remplace celle qui n'a pas encore commencé) ; result()
+    retourne (request, résultat) pour la dernière demande terminée, une seule
+    fois, ou None. Si plan() lève une exception, le thread continue de
+    traiter les demandes suivantes et result() la relève dans le thread
+    appelant.
+    """
+    def __init__(self, plan):
+        self.plan = plan
+        self.condition = threading.Condition()
+        self.request = None    # demande en attente
+        self.running = False   # une demande est en cours de calcul
+        self.finished = None   # (demande, résultat) pas encore lu
+        self.error = None      # exception levée par plan(), pas encore relevée
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, name='planner', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.request is None and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                request, self.request = self.request, None
+                self.running = True
+
+            try:
+                result = self.plan(*request)
+            except Exception as error:
+                with self.condition:
+                    self.error = error
+                    self.running = False
+                continue
+
+            with self.condition:
+                self.finished = (request, result)
+                self.running = False
+
+    def submit(self, *request):
+        with self.condition:
+            self.request = request
+            self.condition.notify()
+
+    def busy(self):
+        """ Une demande est-elle en attente ou en cours de calcul ? """
+        with self.condition:
+            return self.request is not None or self.running
+
+    def result(self):
+        with self.condition:
+            error, self.error = self.error, None
+            finished, self.finished = self.finished, None
+        if error is not None:
+            raise error
+        return finished
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join()
+
+
+class AsyncSpatioTemporalAgent:
+    """
+    SpatioTemporalAgent dont les plans sont calculés dans un PlannerThread.
+    À chaque tick, act() valide la suite du plan contre le monde réel (peu
+    coûteux) et la tronque avant la première étape dangereuse ; un nouveau
+    plan est demandé depuis la dernière case du plan, pour le tick où la
+    grenouille l'atteindra, ou depuis sa case actuelle si elle n'a plus de plan.
+    Dans ce dernier cas, la grenouille attend sur sa case pendant la
+    recherche : le plan part du tick où elle devrait se terminer, estimé
+    d'après la durée (en ticks) de la recherche précédente, et les ticks
+    d'attente restants à son arrivée sont ajoutés en tête du plan.
+    Un plan terminé est recalé sur le tick courant : les étapes des ticks
+    déjà écoulés sont sautées s'il part de la case où se trouve la
+    grenouille à ce moment-là, sinon il est abandonné et redemandé.
+    """
+    def __init__(self, agent):
+        self.agent = agent
+        self.cache = lanes.LaneCache()  # voies des photographies, propres à ce planificateur
+        self.thread = PlannerThread(self._plan)
+        self.stale_plans = 0  # plans reçus trop tard ou pour une autre situation, abandonnés
+        self.latency = 0      # durée en ticks de la dernière recherche
+
+    def _plan(self, snapshot, start_pos_grid, ticks_ahead):
+        return self.agent.plan(snapshot, start_pos_grid, ticks_ahead)
+
+    def act(self, world, frog):
+        if frog.path and frog.path_step >= len(frog.path):
+            frog.path = []
+            frog.path_step = 0
+
+        if frog.dead:
+            return
+
+        # Dernier plan terminé, s'il correspond encore à la grenouille
+        finished = self.thread.result()
+        if finished is not None:
+            (snapshot, _, ticks_ahead), plan = finished
+            self.latency = world.tick - snapshot.tick
+            if plan and not self.adopt(world, frog, plan, snapshot.tick + ticks_ahead):
+                self.stale_plans += 1
+
+        if frog.path:
+            invalid = self.agent.first_invalid_step(world, frog)
+            if invalid is not None:
+                frog.path = frog.path[:invalid]
+
+        # Plan absent, tronqué ou partiel : on demande la suite
+        if not self.thread.busy() and not self.complete(world, frog):
+            self.request(world, frog)
+
+    @staticmethod
+    def complete(world, frog):
+        """ Le plan restant de la grenouille mène-t-il à l'arrivée ? """
+        return frog.path_step < len(frog.path) and frog.path[-1][1] <= world.level.goal_row
+
+    def request(self, world, frog):
+        """ Demande un plan qui prolonge celui de la grenouille (ou part de sa case). """
+        if frog.path_step < len(frog.path):
+            anchor = frog.path[-1][0:2]
+            ticks_ahead = len(frog.path) - 1 - frog.path_step
+        else:
+            # La grenouille attend sur sa case pendant la recherche, avec un
+            # tick de marge sur la durée de la précédente
+            anchor = (frog.rect.x // astar.TILE_SIZE, frog.rect.y // astar.TILE_SIZE)
+            ticks_ahead = self.latency + 1
+        self.thread.submit(WorldSnapshot(world, self.cache), anchor, ticks_ahead)
+
+    def adopt(self, world, frog, plan, plan_tick):
+        """
+        Raccorde plan, dont l'étape k s'exécute pendant le tick plan_tick + k,
+        au plan de la grenouille. Retourne False s'il ne part pas de la case
+        où elle sera au tick plan_tick.
+        """
+        if len(plan) < 2:
+            return False
+        # Indice, dans frog.path, de l'étape exécutée pendant le tick plan_tick
+        index = plan_tick - world.tick + frog.path_step
+        if frog.path_step < len(frog.path):
+            if not frog.path_step <= index < len(frog.path) or frog.path[index][0:2] != plan[0][0:2]:
+                return False
+            frog.path = frog.path[:index] + [(col, row, frog.path[index][2] + t) for col, row, t in plan]
+            return True
+
+        # Pas de plan en cours : la grenouille attend sur sa case
+        elapsed = world.tick - plan_tick
+        position = (frog.rect.x // astar.TILE_SIZE, frog.rect.y // astar.TILE_SIZE)
+        if elapsed < 0:
+            # Plan reçu avant son premier tick : on attend jusque-là
+            if plan[0][0:2] != position:
+                return False
+            frog.path = ([position + (t,) for t in range(-elapsed)]
+                         + [(col, row, t - elapsed) for col, row, t in plan])
+            frog.path_step = 0
+            return True
+        # Plan reçu en retard : les étapes déjà écoulées doivent être des attentes
+        if elapsed >= len(plan):
+            return False
+        if any(plan[k][0:2] != position for k in range(max(elapsed, 1))):
+            return False
+        frog.path = plan
+        frog.path_step = elapsed
+        return True
+
+    def stop(self):
+        self.thread.stop()
+
+
+class AsyncReactiveAgent:
+    """
+    ReactiveAgent dont les chemins sont calculés dans un PlannerThread.
+    Un chemin est spatial, sans horaire : à chaque tick, act() cherche la
+    case actuelle de la grenouille dans le dernier chemin reçu et fait le
+    pas suivant si la grille du tick courant le permet, puis redemande un
+    chemin depuis la case actuelle.
+    """
+    def __init__(self, agent):
+        self.agent = agent
+        self.cache = lanes.LaneCache()  # voies des photographies, propres à ce planificateur
+        self.thread = PlannerThread(self._path)
+        self.path = None  # dernier chemin reçu
+
+    def _path(self, snapshot, start_pos_grid, frog):
+        return self.agent.paths(snapshot, [start_pos_grid], keys=[frog])[0]
+
+    def act(self, world, frog):
+        if frog.dead:
+            self.path = None
+            return
+
+        finished = self.thread.result()
+        if finished is not None:
+            self.path = finished[1]
+
+        position = (frog.rect.x // astar.TILE_SIZE, frog.rect.y // astar.TILE_SIZE)
+        if self.path and position in self.path:
+            index = self.path.index(position)
+            if index + 1 < len(self.path):
+                col, row = self.path[index + 1]
+                grid = lanes.WorldTimeline(world.world_sprites(), world.level).conservative_grid()
+                if not grid[row][col]:
+                    frog.move_to((col, row))
+                    position = (col, row)
+
+        if not self.thread.busy():
+            self.thread.submit(WorldSnapshot(world, self.cache), position, frog)
+
+    def stop(self):
+        self.thread.stop()
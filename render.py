@@ -0,0 +1,70 @@
+# render.py
+#
+# Rendu pygame d'un simulation.World : fenêtre, images et textes.
+# Toute la logique du jeu reste dans simulation.py.
+
+import pygame
+
+white = (255, 255, 255)
+
+
+class Renderer:
+    def __init__(self, world, caption):
+        pygame.init()
+        self.world = world
+        self.screen = pygame.display.set_mode((world.width, world.height))
+        pygame.display.set_caption(caption)
+
+        # === CHARGEMENT DES IMAGES ===
+        self.backgroundImage = pygame.image.load('images/background.gif')
+
+        self.frog_img = pygame.image.load('images/frog10.gif')
+        self.frog_dead_img = pygame.image.load('images/frog11.png')
+
+        self.car_images = {
+            'yellow': pygame.image.load('images/yellowCar.gif'),
+            'dozer': pygame.image.load('images/dozer.gif'),
+            'purple': pygame.image.load('images/purpleCar.gif'),
+            'green': pygame.image.load('images/greenCar.gif'),
+            'truck': pygame.image.load('images/truck.gif'),
+        }
+        self.log_images = {
+            'short': pygame.image.load('images/logShort.gif'),
+            'medium': pygame.image.load('images/logMedium.gif'),
+            'long': pygame.image.load('images/logLong.gif'),
+        }
+        # Indexé par (taille, état) : état 1 = la tortue plonge
+        self.turtle_images = {
+            (2, 0): pygame.image.load('images/turtletwo.gif'),
+            (2, 1): pygame.image.load('images/turtletwodown.gif'),
+            (3, 0): pygame.image.load('images/turtlethree.gif'),
+            (3, 1): pygame.image.load('images/turtlethreedown.gif'),
+        }
+
+        self.font = pygame.font.Font('freesansbold.ttf', 16)
+
+    def message_display(self, text, position):
+        textSurface = self.font.render(text, True, white)
+        textRect = textSurface.get_rect()
+        textRect.center = ((self.world.width / 2), 10 + position)
+        self.screen.blit(textSurface, textRect)
+
+    def draw(self, player_frog):
+        world = self.world
+        self.screen.blit(self.backgroundImage, (0, 0))
+
+        for t in world.turtles:
+            self.screen.blit(self.turtle_images[(t.size, t.state)], t.rect)
+        for l in world.logs:
+            self.screen.blit(self.log_images[l.size], l.rect)
+        for c in world.cars:
+            self.screen.blit(self.car_images[c.img], c.rect)
+        for f in world.frogs:
+            self.screen.blit(self.frog_dead_img if f.dead else self.frog_img, f.rect)
+
+        if player_frog.dead:
+            self.message_display('MORT', 0)
+        else:
+            self.message_display('VIVANT', 0)
+
+        pygame.display.update()
@@ -0,0 +1,125 @@
+# runner.py
+#
+# Lance N traversées headless d'un planificateur sur un pool de processus et
+# affiche des statistiques agrégées (victoires, morts par cause, nombre de
+# pas jusqu'à l'arrivée, latence des replanifications).
+#
+# Usage : python runner.py --planner spatio --episodes 1000 --workers 8
+
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import random
+import time
+
+import numpy as np
+
+import simulation
+from agents import ReactiveAgent, SpatioTemporalAgent
+
+PLANNERS = {
+    'reactive': ReactiveAgent,
+    'dstar': functools.partial(ReactiveAgent, incremental=True),
+    'spatio': SpatioTemporalAgent,
+    # Recherche arrêtée après ~1 ms (hors construction des tables), plan amélioré au fil des ticks
+    'anytime': functools.partial(SpatioTemporalAgent, budget_ms=1),
+    # Recherche sur les intervalles sûrs : horizon dix fois plus long
+    'sipp': functools.partial(SpatioTemporalAgent, sipp=True, max_time=1000),
+}
+
+# Les voies ont des périodes de l'ordre de 100 à 200 ticks : un démarrage
+# aléatoire dans cette plage donne des traversées variées.
+MAX_WARMUP_TICKS = 1000
+
+DEATH_CAUSES = ['car', 'water', 'off-screen', 'diving turtle']
+
+
+def run_one(args):
+    """ Joue une traversée (dans un processus du pool). """
+    planner, episode, seed, max_ticks = args
+    # Chaque traversée a sa propre graine : résultat indépendant de l'ordonnancement
+    rng = random.Random(seed * 1000003 + episode)
+    warmup_ticks = rng.randrange(MAX_WARMUP_TICKS)
+    # Le hasard global (agents, monde) en dérive aussi, quel que soit le processus
+    random.seed(rng.getrandbits(64))
+    agent = PLANNERS[planner]()
+    result = simulation.run_episode(agent, max_ticks=max_ticks, warmup_ticks=warmup_ticks)
+    result['replan_times'] = agent.replan_times
+    return result
+
+
+def summarize(results, elapsed):
+    """ Agrège les résultats des traversées en un dict de statistiques. """
+    victories = [r for r in results if r['outcome'] == 'victory']
+    replan_times = np.array([t for r in results for t in r['replan_times']]) * 1e3
+
+    stats = {
+        'episodes': len(results),
+        'crossings': len(victories),
+        'deaths': {cause: sum(1 for r in results if r['cause'] == cause) for cause in DEATH_CAUSES},
+        'timeouts': sum(1 for r in results if r['outcome'] == 'timeout'),
+        'mean_steps_to_goal': float(np.mean([r['ticks'] for r in victories])) if victories else None,
+        'replans': len(replan_times),
+        'elapsed_s': elapsed,
+        'episodes_per_s': len(results) / elapsed if elapsed else None,
+    }
+    if len(replan_times):
+        for p in (50, 90, 99):
+            stats[f'replan_ms_p{p}'] = float(np.percentile(replan_times, p))
+        stats['replan_ms_max'] = float(replan_times.max())
+    return stats
+
+
+def run(planner, episodes, workers=None, seed=0, max_ticks=1000):
+    """ Joue `episodes` traversées sur `workers` processus et retourne les statistiques. """
+    if workers is None:
+        workers = os.cpu_count()
+    tasks = [(planner, episode, seed, max_ticks) for episode in range(episodes)]
+
+    start = time.perf_counter()
+    if workers <= 1:
+        results = [run_one(task) for task in tasks]
+    else:
+        # Gros paquets de traversées par processus : peu d'échanges entre processus
+        chunksize = max(1, episodes // (workers * 4))
+        with multiprocessing.Pool(workers) as pool:
+            results = list(pool.imap_unordered(run_one, tasks, chunksize=chunksize))
+    return summarize(results, time.perf_counter() - start)
+
+
+def print_stats(planner, stats):
+    print(f"=== {planner} : {stats['episodes']} traversées en {stats['elapsed_s']:.2f} s "
+          f"({stats['episodes_per_s']:.1f} traversées/s) ===")
+    print(f"victoires : {stats['crossings']}")
+    for cause, count in stats['deaths'].items():
+        print(f"morts ({cause}) : {count}")
+    print(f"délai dépassé : {stats['timeouts']}")
+    if stats['mean_steps_to_goal'] is not None:
+        print(f"pas moyens jusqu'à l'arrivée : {stats['mean_steps_to_goal']:.1f}")
+    if stats['replans']:
+        print(f"replanifications : {stats['replans']} (p50 {stats['replan_ms_p50']:.3f} ms, "
+              f"p90 {stats['replan_ms_p90']:.3f} ms, p99 {stats['replan_ms_p99']:.3f} ms, "
+              f"max {stats['replan_ms_max']:.3f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Traversées headless en parallèle")
+    parser.add_argument('--planner', choices=sorted(PLANNERS), default='spatio')
+    parser.add_argument('--episodes', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None, help="nombre de processus (défaut : tous les cœurs)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-ticks', type=int, default=1000)
+    parser.add_argument('--json', action='store_true', help="affiche les statistiques en JSON")
+    args = parser.parse_args()
+
+    stats = run(args.planner, args.episodes, args.workers, args.seed, args.max_ticks)
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print_stats(args.planner, stats)
+
+
+if __name__ == '__main__':
+    main()
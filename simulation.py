@@ -0,0 +1,348 @@
+# simulation.py
+#
+# Moteur de simulation "headless" du Frogger : toute la logique du monde
+# (tortues, bûches, voitures, grenouilles, plongée des tortues) sans fenêtre,
+# sans chargement d'images et sans limitation de fps.
+# Les scripts frogger.py et frogger_spatiotemporal.py ne font qu'ajouter un
+# rendu pygame (render.py) par-dessus ce moteur.
+
+import random
+import time
+
+import pygame
+
+import instrument
+import lanes
+from level import DEFAULT_LEVEL, DIVE_PERIOD, TILE_SIZE
+
+# === CONSTANTES ===
+# Dimensions du niveau d'origine ; chaque World lit les siennes dans son plateau
+SCREEN_WIDTH = DEFAULT_LEVEL.screen_width
+SCREEN_HEIGHT = DEFAULT_LEVEL.screen_height
+
+
+class Turtle(pygame.sprite.Sprite):
+    def __init__(self, canDive, size, startX, startY, width, height, speed):
+        pygame.sprite.Sprite.__init__(self)
+        self.canDive = canDive
+        self.size = size
+        self.rect = pygame.Rect(startX, startY, width, height)
+        self.speed = speed
+        self.state = 0  # 0 - not diving, 1 - diving
+
+    def update(self, world):
+        self.move_rect(self.rect, self.speed, world.width)
+
+    # Déplacement d'un tick, partagé avec la prédiction des planificateurs (lanes.py)
+    @staticmethod
+    def move_rect(rect, speed, screen_width):
+        rect.x += speed
+        if speed < 0 and rect.right < 0:
+            rect.left = screen_width
+
+    # Effet d'une collision avec une grenouille vivante (voir World.step)
+    def hit(self, frog):
+        if self.state == 1:
+            frog.die('diving turtle')
+        else:
+            frog.rect.x += self.speed
+
+
+class Log(pygame.sprite.Sprite):
+    def __init__(self, startX, startY, size, width, height, speed):
+        pygame.sprite.Sprite.__init__(self)
+        self.size = size
+        self.rect = pygame.Rect(startX, startY, width, height)
+        self.speed = speed
+
+    def update(self, world):
+        self.move_rect(self.rect, self.speed, world.width)
+
+    @staticmethod
+    def move_rect(rect, speed, screen_width):
+        rect.x += speed
+        if speed > 0 and rect.left > screen_width:
+            rect.right = 0
+
+    def hit(self, frog):
+        frog.rect.x += self.speed
+
+
+class Car(pygame.sprite.Sprite):
+    def __init__(self, startX, startY, img, speed, direction, width, height):
+        pygame.sprite.Sprite.__init__(self)
+        self.img = img
+        self.rect = pygame.Rect(startX, startY, width, height)
+        self.speed = speed * direction
+
+    def update(self, world):
+        self.move_rect(self.rect, self.speed, world.width)
+
+    @staticmethod
+    def move_rect(rect, speed, screen_width):
+        rect.x += speed
+        if speed > 0 and rect.left > screen_width:
+            rect.right = 0
+        elif speed < 0 and rect.right < 0:
+            rect.left = screen_width
+
+    def hit(self, frog):
+        frog.die('car')
+
+
+class Frog(pygame.sprite.Sprite):
+    def __init__(self, start_centerx, start_y):
+        pygame.sprite.Sprite.__init__(self)
+        self.rect = pygame.Rect(0, 0, TILE_SIZE, TILE_SIZE)
+        self.start_centerx = start_centerx
+        self.start_y = start_y
+        self.reset()
+
+    # Réinitialise la position, l'état et le plan de la grenouille
+    def reset(self):
+        self.rect.centerx = self.start_centerx
+        self.rect.y = self.start_y
+        self.dead = False
+        self.death_cause = None
+        # Le chemin à suivre (positions de grille) et l'étape actuelle
+        self.path = []
+        self.path_step = 0
+
+    # Suit le plan pas à pas s'il en existe un, puis vérifie son statut
+    def update(self, world):
+        if self.dead:
+            return None
+
+        if self.path and self.path_step < len(self.path):
+            self.move_to(self.path[self.path_step][0:2])
+            self.path_step += 1
+
+        return self.check_status(world)
+
+    # Vérifie si la grenouille est dans l'eau, hors de l'écran ou a gagné.
+    # Retourne 'victory' si elle a atteint l'arrivée, None sinon.
+    def check_status(self, world):
+        if self.dead:
+            return None
+
+        # Hors de l'écran à cause d'une bûche/tortue
+        if self.rect.right < 0 or self.rect.left > world.width:
+            self.die('off-screen')
+            return None
+
+        # Dans la rivière
+        if world.level.in_river(self.rect.y):
+            on_safe_surface = False
+            # Vérifie si elle est sur une bûche ou une tortue non plongeante
+            # (seuls les sprites de sa ligne sont testés, via l'index des voies)
+            for sprite in world.lane_index.overlapping(self.rect):
+                if isinstance(sprite, Log) or (isinstance(sprite, Turtle) and sprite.state == 0):
+                    on_safe_surface = True
+                    break
+
+            if not on_safe_surface:
+                self.die('water')
+
+        # Zone d'arrivée
+        elif world.level.reached_goal(self.rect.y):
+            return 'victory'
+
+        return None
+
+    # cause : 'car', 'water', 'off-screen' ou 'diving turtle'
+    def die(self, cause=None):
+        if not self.dead:
+            self.dead = True
+            self.death_cause = cause
+
+    def move_to(self, grid_pos):
+        self.rect.x = grid_pos[0] * TILE_SIZE
+        self.rect.y = grid_pos[1] * TILE_SIZE
+
+
+class World:
+    """
+    L'état complet d'une partie, avancé tick par tick avec step().
+    Aucune fenêtre ni image n'est nécessaire.
+    """
+    def __init__(self, level=None):
+        # Le plateau (level.Level) : taille, voies, rivière, arrivée
+        self.level = level if level is not None else DEFAULT_LEVEL
+        self.width = self.level.screen_width
+        self.height = self.level.screen_height
+
+        self.all_sprites = pygame.sprite.Group()
+        self.cars = pygame.sprite.Group()
+        self.logs = pygame.sprite.Group()
+        self.turtles = pygame.sprite.Group()
+        self.frogs = pygame.sprite.Group()
+
+        self.turtle_counter = 0
+        self.tick = 0
+        self.set_level()
+
+    # Configure ou réinitialise les obstacles
+    def set_level(self):
+        for sprite in self.all_sprites:
+            sprite.kill()
+
+        for lane in self.level.lanes:
+            y = lane.row * TILE_SIZE
+            for i, x in enumerate(lane.xs):
+                if lane.kind == 'turtle':
+                    sprite = Turtle(2 if i in lane.divers else 1, lane.style, x, y, lane.width, TILE_SIZE, lane.speed)
+                    self.turtles.add(sprite)
+                elif lane.kind == 'log':
+                    sprite = Log(x, y, lane.style, lane.width, TILE_SIZE, lane.speed)
+                    self.logs.add(sprite)
+                else:
+                    direction = 1 if lane.speed > 0 else -1
+                    sprite = Car(x, y, lane.style, abs(lane.speed), direction, lane.width, TILE_SIZE)
+                    self.cars.add(sprite)
+                self.all_sprites.add(sprite)
+
+        # Index des sprites par ligne, pour les collisions
+        self.lane_index = lanes.LaneIndex(self.all_sprites)
+        self.turtle_counter = 0
+
+    # col : colonne de départ (par défaut le milieu de la ligne de départ)
+    def add_frog(self, col=None):
+        centerx = self.width / 2 if col is None else col * TILE_SIZE + TILE_SIZE // 2
+        frog = Frog(centerx, self.level.start_row * TILE_SIZE)
+        self.frogs.add(frog)
+        return frog
+
+    def world_sprites(self):
+        """ L'état du monde tel qu'attendu par astar_spatiotemporal. """
+        return (self.cars, self.logs, self.turtles, self.turtle_counter)
+
+    def resolve_collisions(self, frog):
+        """
+        Applique à la grenouille les collisions avec les sprites qui la
+        chevauchent, dans l'ordre de mise à jour des sprites : une bûche qui
+        emporte la grenouille peut la pousser sur le sprite suivant, comme
+        lorsque chaque sprite testait les grenouilles juste après avoir bougé.
+        """
+        last = -1
+        while not frog.dead:
+            sprite = self.lane_index.first_overlapping(frog.rect, after=last)
+            if sprite is None:
+                return
+            last = self.lane_index.order[sprite]
+            sprite.hit(frog)
+
+    def step(self):
+        """
+        Avance le monde d'un tick : les obstacles bougent (et emportent ou
+        tuent les grenouilles), puis chaque grenouille suit son plan.
+        Retourne la liste des événements (frog, 'victory' | 'death').
+        """
+        alive = [f for f in self.frogs if not f.dead]
+
+        # Les obstacles bougent, puis chaque grenouille ne teste que les sprites de sa ligne
+        with instrument.timer('world.sprites'):
+            self.all_sprites.update(self)
+            self.lane_index.refresh()
+            for frog in alive:
+                self.resolve_collisions(frog)
+
+        events = []
+        with instrument.timer('world.frogs'):
+            for frog in alive:
+                if frog.update(self) == 'victory':
+                    events.append((frog, 'victory'))
+                    frog.reset()
+                elif frog.dead:
+                    events.append((frog, 'death'))
+
+        # --- Gestion des tortues qui plongent ---
+        self.turtle_counter += 1
+        if self.turtle_counter >= DIVE_PERIOD:
+            self.turtle_counter = 0
+            for t in self.turtles:
+                if t.canDive == 2:
+                    t.state = 1 - t.state
+
+        self.tick += 1
+        return events
+
+
+def run_episode(agent, max_ticks=1000, world=None, warmup_ticks=0, trace=None, recorder=None):
+    """
+    Joue une traversée complète sans affichage ni limitation de vitesse.
+    Le monde avance d'abord de warmup_ticks ticks sans grenouille, pour
+    démarrer la traversée à une autre phase des voies.
+    trace (snapshot.TraceWriter) enregistre le monde vu par l'agent à chaque
+    tick, recorder (episode.EpisodeRecorder) aussi la grenouille et son plan.
+    S'arrête à la première victoire, à la mort ou après max_ticks.
+    Retourne un dict {'outcome': 'victory' | 'death' | 'timeout',
+    'ticks': nombre de ticks joués, 'cause': cause de la mort ou None}.
+    """
+    if world is None:
+        world = World()
+    for _ in range(warmup_ticks):
+        world.step()
+        instrument.end_frame()
+    frog = world.add_frog()
+
+    for tick in range(1, max_ticks + 1):
+        if trace is not None:
+            trace.append(world)
+        if recorder is not None:
+            recorder.before_agent(world)
+        with instrument.timer('agent'):
+            agent.act(world, frog)
+        if recorder is not None:
+            recorder.after_agent(world)
+        events = world.step()
+        instrument.end_frame()
+        for f, event in events:
+            if f is frog:
+                return {'outcome': event, 'ticks': tick, 'cause': frog.death_cause}
+
+    return {'outcome': 'timeout', 'ticks': max_ticks, 'cause': None}
+
+
+def run_swarm(agent, n_frogs, ticks=200, world=None, seed=0, trace=None):
+    """
+    Fait jouer n_frogs grenouilles indépendantes dans le même monde pendant
+    ticks ticks. Elles partent de colonnes tirées au hasard ; une grenouille
+    morte repart aussitôt de sa case de départ, pour garder n_frogs
+    grenouilles en jeu. L'agent planifie pour toutes en un seul appel
+    (act_all) quand il le permet, sinon grenouille par grenouille.
+    trace (snapshot.TraceWriter) enregistre le monde à chaque tick.
+    Retourne un dict {'frogs', 'ticks', 'victories', 'deaths': {cause: n},
+    'plan_s': temps passé dans l'agent, 'frogs_per_s': grenouilles
+    traitées par seconde d'agent}.
+    """
+    if world is None:
+        world = World()
+    rng = random.Random(seed)
+    frogs = [world.add_frog(rng.randrange(world.level.grid_width)) for _ in range(n_frogs)]
+    act_all = getattr(agent, 'act_all', None)
+
+    victories = 0
+    deaths = {}
+    plan_s = 0.0
+    for _ in range(ticks):
+        if trace is not None:
+            trace.append(world)
+        started = time.perf_counter()
+        with instrument.timer('agent'):
+            if act_all is not None:
+                act_all(world, frogs)
+            else:
+                for frog in frogs:
+                    agent.act(world, frog)
+        plan_s += time.perf_counter() - started
+
+        for frog, event in world.step():
+            if event == 'victory':
+                victories += 1
+            else:
+                deaths[frog.death_cause] = deaths.get(frog.death_cause, 0) + 1
+                frog.reset()
+        instrument.end_frame()
+
+    return {'frogs': n_frogs, 'ticks': ticks, 'victories': victories, 'deaths': deaths,
+            'plan_s': plan_s, 'frogs_per_s': n_frogs * ticks / plan_s if plan_s else None}
@@ -0,0 +1,300 @@
+# snapshot.py
+#
+# Format binaire compact et sans perte de l'état des obstacles d'un World :
+# voies (ligne, vitesse, largeur, style), positions x, états de plongée des
+# tortues et compteur de plongée. Un fichier est une trace : un en-tête (le
+# plateau et les propriétés fixes des sprites), puis un enregistrement de
+# taille fixe par tick, lu par np.memmap sans copie. Un instantané isolé est
+# une trace d'un seul tick.
+#
+#   snapshot.save('monde.frg', world)
+#   snap = snapshot.load('monde.frg')
+#   agent.plan(snap, (7, 14))                       # les deux planificateurs l'acceptent
+#
+#   with snapshot.TraceWriter('partie.frg', world) as trace:
+#       simulation.run_episode(agent, world=world, trace=trace)
+#   for world in snapshot.replay(snapshot.load_trace('partie.frg')):
+#       ...                                         # le même monde, tick par tick
+
+import struct
+
+import numpy as np
+
+import lanes
+import simulation
+from level import CAR_WIDTHS, LOG_WIDTHS, TILE_SIZE, TURTLE_WIDTHS, Lane, Level
+
+MAGIC = b'FRGT'
+VERSION = 1
+
+# magic, version, grid_width, grid_height, river_rows (start, stop), goal_row,
+# start_row, nombre de goal_cols, nombre de sprites
+HEADER = struct.Struct('<4sHHHHHHHHI')
+
+# Types de sprites et styles (image de la voiture, taille de la bûche, nombre
+# de tortues), codés par leur indice
+KINDS = ('car', 'log', 'turtle')
+STYLES = {'car': tuple(CAR_WIDTHS), 'log': tuple(LOG_WIDTHS), 'turtle': tuple(TURTLE_WIDTHS)}
+SPRITE_CLASSES = (simulation.Car, simulation.Log, simulation.Turtle)
+
+# Propriétés fixes d'un sprite, écrites une fois dans l'en-tête
+SPRITE_DTYPE = np.dtype([('kind', 'u1'), ('style', 'u1'), ('can_dive', 'u1'),
+                         ('row', '<u2'), ('width', '<i4'), ('speed', '<f8')])
+
+
+def frame_dtype(n_sprites):
+    """ Un tick de la trace : tick, compteur de plongée, x et état de chaque sprite. """
+    return np.dtype([('tick', '<i8'), ('turtle_counter', '<i4'),
+                     ('x', '<i4', (n_sprites,)), ('state', 'u1', (n_sprites,))])
+
+
+def _sprite_record(sprite):
+    if isinstance(sprite, simulation.Turtle):
+        kind, style, can_dive = 'turtle', sprite.size, sprite.canDive
+    elif isinstance(sprite, simulation.Log):
+        kind, style, can_dive = 'log', sprite.size, 0
+    else:
+        kind, style, can_dive = 'car', sprite.img, 0
+    if style not in STYLES[kind]:
+        raise ValueError(f"style de {kind} inconnu : {style!r}")
+    if sprite.rect.top % TILE_SIZE or sprite.rect.height != TILE_SIZE:
+        raise ValueError(f"sprite hors de la grille : {sprite.rect}")
+    return (KINDS.index(kind), STYLES[kind].index(style), can_dive,
+            sprite.rect.top // TILE_SIZE, sprite.rect.width, sprite.speed)
+
+
+def capture_frame(world, header):
+    """ L'enregistrement d'un tick du monde, pour l'en-tête header. """
+    frame = np.zeros((), header.frame_dtype)
+    frame['tick'] = world.tick
+    frame['turtle_counter'] = world.turtle_counter
+    frame['x'] = [sprite.rect.x for sprite in world.all_sprites]
+    frame['state'] = [getattr(sprite, 'state', 0) for sprite in world.all_sprites]
+    return frame
+
+
+class Header:
+    """
+    Ce qui ne change pas d'un tick à l'autre : le plateau (sans ses voies,
+    reconstruites à partir des sprites) et les propriétés fixes des sprites,
+    dans l'ordre de mise à jour du monde.
+    """
+    def __init__(self, level, sprites):
+        self.level = level
+        self.sprites = sprites  # tableau SPRITE_DTYPE
+        self.frame_dtype = frame_dtype(len(sprites))
+
+    @classmethod
+    def of(cls, world):
+        sprites = np.array([_sprite_record(s) for s in world.all_sprites], dtype=SPRITE_DTYPE)
+        return cls(world.level, sprites)
+
+    def to_bytes(self):
+        level = self.level
+        data = HEADER.pack(MAGIC, VERSION, level.grid_width, level.grid_height,
+                           level.river_rows.start, level.river_rows.stop, level.goal_row,
+                           level.start_row, len(level.goal_cols), len(self.sprites))
+        data += np.array(list(level.goal_cols), dtype='<u2').tobytes()
+        data += self.sprites.tobytes()
+        return data + bytes(-len(data) % 8)  # les ticks commencent sur 8 octets
+
+    @classmethod
+    def from_bytes(cls, data):
+        """ Retourne (Header, taille de l'en-tête en octets). """
+        (magic, version, grid_width, grid_height, river_start, river_stop,
+         goal_row, start_row, n_goals, n_sprites) = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("ce n'est pas une trace de monde Frogger")
+        if version != VERSION:
+            raise ValueError(f"version de trace non prise en charge : {version}")
+        offset = HEADER.size
+        goal_cols = np.frombuffer(data, '<u2', n_goals, offset).tolist()
+        offset += 2 * n_goals
+        sprites = np.frombuffer(data, SPRITE_DTYPE, n_sprites, offset).copy()
+        offset += SPRITE_DTYPE.itemsize * n_sprites
+        offset += -offset % 8
+        level = Level(grid_width, grid_height, _lanes(sprites), range(river_start, river_stop),
+                      goal_row, start_row, goal_cols)
+        return cls(level, sprites), offset
+
+
+def _lanes(sprites):
+    """
+    Voies du plateau, une par suite de sprites consécutifs de même type,
+    ligne, vitesse, largeur et style : World.set_level recrée alors les
+    sprites dans le même ordre. Les abscisses sont celles de chaque tick.
+    """
+    result = []
+    key = None
+    for kind, style, can_dive, row, width, speed in sprites.tolist():
+        if (kind, style, row, width, speed) != key:
+            key = (kind, style, row, width, speed)
+            lane = Lane(KINDS[kind], row, speed, [], width, STYLES[KINDS[kind]][style])
+            result.append(lane)
+        if can_dive == 2:
+            lane.divers.add(len(lane.xs))
+        lane.xs.append(0)
+    return result
+
+
+class Snapshot:
+    """
+    L'état des obstacles d'un monde à un tick. Il s'utilise comme un World
+    par les planificateurs (level, tick, world_sprites()) et to_world()
+    reconstruit un World identique, sans grenouille.
+    """
+    def __init__(self, header, frame, source=None):
+        self.header = header
+        self.frame = frame
+        self.level = header.level
+        self.tick = int(frame['tick'])
+        self.turtle_counter = int(frame['turtle_counter'])
+        # Monde d'origine pour les agents (agents.source_world) : la trace
+        # entière, dont les instantanés se suivent dans un même monde
+        self.source = source if source is not None else self
+        self._timeline = None
+
+    def world_sprites(self):
+        """
+        La WorldTimeline de l'instantané, calculée au premier appel
+        directement à partir de l'en-tête et des abscisses du tick, sans
+        reconstruire de World ni de sprites.
+        """
+        if self._timeline is None:
+            # Voies des voitures, puis de la rivière : (ligne, type, vitesse) -> sprites
+            groups = ({}, {})
+            divers_state = None
+            for (kind, _, can_dive, row, width, speed), x, state in zip(
+                    self.header.sprites.tolist(), self.frame['x'].tolist(), self.frame['state'].tolist()):
+                dives = 1 if can_dive == 2 else 0
+                if dives and divers_state is None:
+                    divers_state = state
+                groups[KINDS[kind] != 'car'].setdefault((row, SPRITE_CLASSES[kind], speed), []).append(
+                    (x, row * TILE_SIZE, width, TILE_SIZE, dives))
+            car_lanes, surface_lanes = ([key + (sprites,) for key, sprites in group.items()] for group in groups)
+            self._timeline = lanes.WorldTimeline.from_lanes(car_lanes, surface_lanes, self.turtle_counter,
+                                                            divers_state or 0, self.level)
+        return self._timeline
+
+    def to_world(self):
+        world = simulation.World(self.level)
+        for sprite, x, state in zip(world.all_sprites, self.frame['x'].tolist(), self.frame['state'].tolist()):
+            sprite.rect.x = x
+            if isinstance(sprite, simulation.Turtle):
+                sprite.state = state
+        world.lane_index.refresh()
+        world.turtle_counter = self.turtle_counter
+        world.tick = self.tick
+        return world
+
+    def to_bytes(self):
+        return self.header.to_bytes() + self.frame.tobytes()
+
+
+def capture(world):
+    """ Instantané en mémoire du monde au tick courant. """
+    header = Header.of(world)
+    return Snapshot(header, capture_frame(world, header))
+
+
+class Trace:
+    """
+    Suite d'instantanés d'un même monde, lue depuis un fichier par
+    np.memmap : trace[i] est le i-ième tick enregistré, sans copie ni
+    lecture du reste du fichier. Un dernier tick incomplet (écriture
+    interrompue) est ignoré.
+    """
+    def __init__(self, header, frames):
+        self.header = header
+        self.frames = frames
+        self.level = header.level
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, i):
+        return Snapshot(self.header, self.frames[i], source=self)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+def load_trace(path, mmap=True):
+    with open(path, 'rb') as f:
+        data = f.read(HEADER.size)
+        n_goals, n_sprites = HEADER.unpack(data)[-2:]
+        data += f.read(2 * n_goals + SPRITE_DTYPE.itemsize * n_sprites + 8)
+        f.seek(0, 2)
+        size = f.tell()
+    header, offset = Header.from_bytes(data)
+    count = (size - offset) // header.frame_dtype.itemsize
+    if mmap and count:
+        frames = np.memmap(path, header.frame_dtype, 'r', offset, (count,))
+    else:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            frames = np.frombuffer(f.read(count * header.frame_dtype.itemsize), header.frame_dtype)
+    return Trace(header, frames)
+
+
+def save(path, world):
+    """ Enregistre l'instantané du monde (World ou Snapshot) dans path. """
+    snap = world if isinstance(world, Snapshot) else capture(world)
+    with open(path, 'wb') as f:
+        f.write(snap.to_bytes())
+
+
+def load(path, mmap=True):
+    """ Le premier (ou seul) instantané de path. """
+    trace = load_trace(path, mmap)
+    if not len(trace):
+        raise ValueError(f"{path} ne contient aucun tick")
+    return Snapshot(trace.header, trace.frames[0])
+
+
+class TraceWriter:
+    """
+    Enregistre l'état du monde à chaque appel d'append(), tick après tick.
+    Le fichier est lisible pendant l'écriture (load_trace voit les ticks déjà
+    écrits et vidés sur le disque).
+    """
+    def __init__(self, path, world):
+        self.header = Header.of(world)
+        self.file = open(path, 'wb')
+        self.file.write(self.header.to_bytes())
+        self.count = 0
+
+    def append(self, world):
+        if len(world.all_sprites) != len(self.header.sprites):
+            raise ValueError("le monde n'a plus les mêmes sprites que la trace")
+        self.file.write(capture_frame(world, self.header).tobytes())
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def replay(trace):
+    """
+    Rejoue les obstacles de la trace à pleine vitesse : reconstruit le monde
+    du premier tick puis l'avance avec World.step, en vérifiant qu'il
+    retrouve chaque tick enregistré (ValueError sinon). Produit le World à
+    chacun de ces ticks ; on peut y ajouter des grenouilles et les faire
+    jouer par un agent comme dans le monde d'origine.
+    """
+    if not len(trace):
+        return
+    world = trace[0].to_world()
+    for frame in trace.frames:
+        while world.tick < frame['tick']:
+            world.step()
+        if capture_frame(world, trace.header).tobytes() != frame.tobytes():
+            raise ValueError(f"le monde rejoué diverge de la trace au tick {int(frame['tick'])}")
+        yield world
@@ -0,0 +1,45 @@
+# Journal de partie (episode.py) : rejeu à l'identique et replanification.
+
+import pytest
+
+import episode
+import simulation
+from agents import SpatioTemporalAgent
+
+
+def record(path, warmup_ticks, max_ticks=300):
+    world = simulation.World()
+    for _ in range(warmup_ticks):
+        world.step()
+    with episode.EpisodeRecorder(path, world, buffer_ticks=8) as recorder:
+        result = simulation.run_episode(SpatioTemporalAgent(), max_ticks=max_ticks, world=world,
+                                        recorder=recorder)
+    return result
+
+
+@pytest.mark.parametrize('warmup_ticks', [0, 250, 613])
+def test_replay_matches_the_recorded_episode(tmp_path, warmup_ticks):
+    path = str(tmp_path / 'partie.log')
+    result = record(path, warmup_ticks)
+    recorded = episode.load(path)
+    assert len(recorded) == result['ticks']
+
+    # replay lève ValueError si les obstacles ou la grenouille divergent
+    replayed = [i for i, _, _, _ in episode.replay(recorded)]
+    assert replayed == list(range(len(recorded)))
+
+    found = episode.deaths(recorded)
+    if result['outcome'] == 'death':
+        assert [death['cause'] for death in found] == [result['cause']]
+    else:
+        assert found == []
+
+
+def test_replan_reproduces_the_recorded_decision(tmp_path):
+    path = str(tmp_path / 'partie.log')
+    record(path, 120)
+    recorded = episode.load(path)
+    # Au premier tick, la grenouille n'a pas encore de plan : même décision
+    result = episode.replan(recorded, 0, SpatioTemporalAgent())
+    assert result['replanned']['after'] == result['recorded']['after']
+    assert result['replanned']['path'] == result['recorded']['path']
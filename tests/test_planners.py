@@ -0,0 +1,97 @@
+# Planificateurs : buts multiples, D* Lite contre A*, SIPP contre la
+# recherche tick par tick.
+
+import random
+
+import pytest
+
+import astar
+import astar_spatiotemporal as astar_st
+import dstar_lite
+import simulation
+
+START = (6, 14)
+GOALS = [(x, 2) for x in range(1, 13, 2)]
+
+
+def random_grid(rng, width, height, density):
+    return [[1 if rng.random() < density else 0 for _ in range(width)] for _ in range(height)]
+
+
+def world_after(ticks):
+    world = simulation.World()
+    for _ in range(ticks):
+        world.step()
+    return world
+
+
+def test_goal_set_accepts_one_goal_or_a_collection():
+    assert astar.goal_set((3, 4)) == frozenset([(3, 4)])
+    assert astar.goal_set([3, 4]) == frozenset([(3, 4)])
+    assert astar.goal_set([(1, 2), (3, 4)]) == frozenset([(1, 2), (3, 4)])
+    assert astar.goal_set({(1, 2), (3, 4)}) == frozenset([(1, 2), (3, 4)])
+    assert astar.goal_set(frozenset([(1, 2)])) == frozenset([(1, 2)])
+
+
+def test_astar_with_a_set_of_goals_matches_the_list():
+    world = world_after(137)
+    grid = astar.conservative_grid(world.width, world.height, world.cars, world.logs,
+                                   world.turtles, world.turtle_counter)
+    assert astar.astar(grid, START, set(GOALS)) == astar.astar(grid, START, GOALS)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_dstar_lite_matches_astar_path_lengths(seed):
+    rng = random.Random(seed)
+    width, height = 12, 10
+    grid = random_grid(rng, width, height, 0.25)
+    start, goal = (rng.randrange(width), height - 1), (rng.randrange(width), 0)
+    grid[start[1]][start[0]] = grid[goal[1]][goal[0]] = 0
+    planner = dstar_lite.DStarLite(grid, start, goal)
+
+    for _ in range(10):
+        expected = astar.astar(grid, start, goal)
+        path = planner.path()
+        assert (path is None) == (expected is None)
+        if path is not None:
+            assert len(path) == len(expected)
+            assert path[0] == start and path[-1] == goal
+
+        # Quelques cases changent et la grenouille avance d'un pas
+        new_grid = [row[:] for row in grid]
+        for _ in range(6):
+            col, row = rng.randrange(width), rng.randrange(height)
+            if (col, row) not in (start, goal):
+                new_grid[row][col] ^= 1
+        if path is not None and len(path) > 1:
+            start = path[1]
+        planner.update(new_grid, dstar_lite.changed_cells(grid, new_grid), start)
+        grid = new_grid
+
+
+@pytest.mark.parametrize('ticks', [0, 53, 211, 478, 905])
+def test_sipp_arrives_with_the_tick_search(ticks):
+    world = world_after(ticks)
+    for start_time in (0, 7):
+        occupancy = astar_st.OccupancyTensor(world.world_sprites(), 0, exact=True)
+        tick_plan = astar_st.spatio_temporal_astar(START, GOALS, None, max_time=150,
+                                                   occupancy=occupancy, start_time=start_time)
+        sipp_plan = astar_st.spatio_temporal_astar(START, GOALS, None, max_time=150,
+                                                   occupancy=occupancy, start_time=start_time, sipp=True)
+        assert (sipp_plan is None) == (tick_plan is None)
+        if tick_plan is not None:
+            assert sipp_plan[-1][2] == tick_plan[-1][2]
+            assert sipp_plan[-1][1] == tick_plan[-1][1]
+            # Chaque étape du plan SIPP est sûre et fait au plus un pas
+            for (col, row, t), (next_col, next_row, next_t) in zip(sipp_plan, sipp_plan[1:]):
+                assert next_t == t + 1
+                assert abs(next_col - col) + abs(next_row - row) <= 1
+                assert occupancy.is_walkable(next_col, next_row, start_time + next_t)
+
+
+def test_sipp_max_nodes_bounds_the_whole_call():
+    world = world_after(123)
+    stats = {}
+    astar_st.spatio_temporal_astar(START, (7, -1), world.world_sprites(), max_time=1000,
+                                   max_nodes=2000, sipp=True, stats=stats)
+    assert stats['expanded'] <= 2000